@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for r2dto.  Run with 'python -m benchmarks --help'.
+"""
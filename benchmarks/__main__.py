@@ -0,0 +1,78 @@
+"""
+    python -m benchmarks run [--quick] [--filter TEXT] [--repeat N] [--output results.json]
+    python -m benchmarks compare baseline.json current.json [--threshold 0.1]
+    python -m benchmarks memory
+
+'run' measures load/dump throughput and allocations for every case and prints or saves the results as JSON.
+'compare' reports the cases that regressed beyond the threshold and exits with 1 if there are any.
+'memory' reports the peak and retained bytes per record of each memory scenario and, on the python version the
+budgets were measured on, exits with 1 if any is over budget.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import memory
+from benchmarks.suite import run, compare
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--quick", action="store_true", help="use fewer records and skip the largest lists")
+    run_parser.add_argument("--filter", help="only run cases whose name contains this text")
+    run_parser.add_argument("--repeat", type=int, help="the number of timed runs per case")
+    run_parser.add_argument("--output", help="write the results to this file rather than stdout")
+
+    compare_parser = commands.add_parser("compare", help="compare two sets of results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="the allowed change as a fraction of the baseline (default 0.1)")
+
+    commands.add_parser("memory", help="check the memory scenarios against their budgets")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = run(quick=args.quick, pattern=args.filter, repeat=args.repeat,
+                      log=lambda line: sys.stderr.write(line + "\n"))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        else:
+            print(json.dumps(results, indent=2, sort_keys=True))
+        return 0
+
+    if args.command == "memory":
+        failures = []
+        for name in memory.scenario_names():
+            result = memory.measure(name)
+            print("{}: peak {:.0f} bytes/record, retained {:.0f} bytes/record".format(
+                name, result["peak_bytes_per_record"], result["retained_bytes_per_record"]))
+            failures.extend(memory.check(name, result))
+        if not memory.is_reference_version():
+            print("The budgets are only checked on CPython {}.{}.".format(*memory.REFERENCE_VERSION))
+            return 0
+        for failure in failures:
+            print(failure)
+        return 1 if failures else 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    for regression in regressions:
+        print(regression)
+    if regressions:
+        print("{} regression(s) beyond {:.0%}".format(len(regressions), args.threshold))
+        return 1
+    print("No regressions beyond {:.0%}".format(args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
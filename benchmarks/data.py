@@ -0,0 +1,132 @@
+"""
+Synthetic serializers and data for the benchmarks.  Everything is generated from a seed so runs are comparable.
+"""
+import random
+import uuid
+
+from r2dto import Serializer
+from r2dto.fields import StringField, BooleanField, FloatField, IntegerField, ListField, ObjectField, UnionField, \
+    DictField, InternetDateTimeField, DateTimeField, UuidField, DateField, TimeField, Field
+
+SEED = 1989
+
+
+class Model(object):
+    pass
+
+
+def make_serializer(name, fields, model=Model):
+    meta = type("Meta", (object,), {"model": model})
+    attrs = dict(fields)
+    attrs["Meta"] = meta
+    return type(name, (Serializer,), attrs)
+
+
+class LeafSerializer(Serializer):
+    class Meta:
+        model = Model
+
+    name = StringField()
+    value = IntegerField()
+
+
+class OtherLeafSerializer(Serializer):
+    class Meta:
+        model = type("OtherModel", (object,), {})
+
+    label = StringField()
+
+
+def _leaf(rnd):
+    return {"name": "leaf{}".format(rnd.randint(0, 1000)), "value": rnd.randint(0, 1000)}
+
+
+# Each entry is (field factory, data generator).  The generators accept a random.Random.
+FIELD_CASES = {
+    "Field": (Field, lambda rnd: rnd.randint(0, 1000)),
+    "StringField": (StringField, lambda rnd: "value{}".format(rnd.randint(0, 10 ** 6))),
+    "BooleanField": (BooleanField, lambda rnd: rnd.random() < 0.5),
+    "IntegerField": (IntegerField, lambda rnd: rnd.randint(-10 ** 9, 10 ** 9)),
+    "FloatField": (FloatField, lambda rnd: rnd.random() * 1000),
+    "DateTimeField": (DateTimeField, lambda rnd: "2013-12-30 23:56:{:02d}.431090".format(rnd.randint(0, 59))),
+    "InternetDateTimeField": (InternetDateTimeField,
+                              lambda rnd: "2015-02-21T14:32:{:02d}.557556Z".format(rnd.randint(0, 59))),
+    "DateField": (DateField, lambda rnd: "2014-02-{:02d}".format(rnd.randint(1, 28))),
+    "TimeField": (TimeField, lambda rnd: "12:04:{:02d}.430123".format(rnd.randint(0, 59))),
+    "UuidField": (UuidField, lambda rnd: str(uuid.UUID(int=rnd.getrandbits(128)))),
+    "ObjectField": (lambda: ObjectField(LeafSerializer), _leaf),
+    "ListField": (lambda: ListField(IntegerField()), lambda rnd: [rnd.randint(0, 100) for _ in range(10)]),
+    "DictField": (lambda: DictField(StringField(), IntegerField()),
+                  lambda rnd: dict(("k{}".format(i), rnd.randint(0, 100)) for i in range(10))),
+    "UnionField": (lambda: UnionField({"leaf": LeafSerializer, "other": OtherLeafSerializer}),
+                   lambda rnd: dict(_leaf(rnd), type="leaf") if rnd.random() < 0.5 else dict(type="other", label="x")),
+}
+
+
+def field_case(field_name, count, seed=SEED):
+    """
+    Returns a serializer with one field of the given type and 'count' records for it.
+    """
+    factory, generate = FIELD_CASES[field_name]
+    serializer_class = make_serializer("{}Serializer".format(field_name), {"value": factory()})
+    rnd = random.Random(seed)
+    return serializer_class, [{"value": generate(rnd)} for _ in range(count)]
+
+
+def nested_case(depth, count, seed=SEED):
+    """
+    Returns a serializer whose records nest 'depth' levels of ObjectField, and 'count' records for it.
+    """
+    serializer_class = LeafSerializer
+    for level in range(depth):
+        serializer_class = make_serializer("Nested{}Serializer".format(level), {
+            "name": StringField(),
+            "child": ObjectField(serializer_class),
+        })
+
+    rnd = random.Random(seed)
+
+    def make(level):
+        if level == 0:
+            return _leaf(rnd)
+        return {"name": "level{}".format(level), "child": make(level - 1)}
+
+    return serializer_class, [make(depth) for _ in range(count)]
+
+
+def list_case(size, seed=SEED):
+    """
+    Returns a serializer with a ListField of IntegerFields and one record holding 'size' items.
+    """
+    serializer_class = make_serializer("List{}Serializer".format(size), {"items": ListField(IntegerField())})
+    rnd = random.Random(seed)
+    return serializer_class, [{"items": [rnd.randint(0, 10 ** 6) for _ in range(size)]}]
+
+
+def wide_case(width, count, seed=SEED):
+    """
+    Returns a serializer with 'width' fields, cycling through strings, integers, floats and booleans.
+    """
+    kinds = [(StringField, lambda rnd: "v{}".format(rnd.randint(0, 1000))),
+             (IntegerField, lambda rnd: rnd.randint(0, 1000)),
+             (FloatField, lambda rnd: rnd.random()),
+             (BooleanField, lambda rnd: rnd.random() < 0.5)]
+    fields = {}
+    generators = []
+    for i in range(width):
+        factory, generate = kinds[i % len(kinds)]
+        fields["f{}".format(i)] = factory()
+        generators.append(("f{}".format(i), generate))
+    serializer_class = make_serializer("Wide{}Serializer".format(width), fields)
+
+    rnd = random.Random(seed)
+    return serializer_class, [dict((name, generate(rnd)) for name, generate in generators) for _ in range(count)]
+
+
+def load_objects(serializer_class, records):
+    res = []
+    for record in records:
+        s = serializer_class(data=record)
+        s.validate()
+        res.append(s.object)
+    return res
@@ -0,0 +1,177 @@
+"""
+Peak and retained memory per record while loading representative payloads, with a budget for each scenario.
+
+The budgets were measured on CPython REFERENCE_VERSION and rounded up.  A scenario is over budget when it uses more
+than its budget plus TOLERANCE.  Object sizes differ between python implementations and versions, so the budgets are
+only checked on the reference version.  Update them when the reference version changes, and only after checking that
+the increase is expected.
+
+Each scenario is measured in a new python process, so that the figures do not depend on what else was loaded before,
+such as other DefaultModel objects sharing their attribute keys.
+"""
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+
+from benchmarks.data import make_serializer, SEED
+from r2dto import Serializer
+from r2dto.fields import StringField, FloatField, IntegerField, BooleanField, ListField, ObjectField, \
+    DateTimeField, InternetDateTimeField
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+TOLERANCE = 0.1
+
+# The (major, minor) version of python the budgets were measured on.
+REFERENCE_VERSION = (3, 11)
+
+RECORDS = 2000
+
+
+class DefaultModelSerializer(Serializer):
+    name = StringField()
+    count = IntegerField()
+    ratio = FloatField()
+    active = BooleanField()
+
+
+def _default_model_case(rnd):
+    records = [{"name": "name{}".format(i), "count": rnd.randint(0, 10 ** 6), "ratio": rnd.random(),
+                "active": rnd.random() < 0.5} for i in range(RECORDS)]
+    return DefaultModelSerializer, records
+
+
+class ViewSerializer(Serializer):
+    class Meta(object):
+        view = True
+    name = StringField()
+    count = IntegerField()
+    ratio = FloatField()
+    active = BooleanField()
+    scores = ListField(IntegerField())
+
+
+def _view_case(rnd):
+    records = [{"name": "name{}".format(i), "count": rnd.randint(0, 10 ** 6), "ratio": rnd.random(),
+                "active": rnd.random() < 0.5, "scores": [rnd.randint(0, 100) for _ in range(10)]}
+               for i in range(RECORDS)]
+    return ViewSerializer, records
+
+
+def _model():
+    return type("Model", (object,), {})
+
+
+def _list_case(rnd):
+    serializer_class = make_serializer("ItemsSerializer", {"items": ListField(IntegerField())}, _model())
+    return serializer_class, [{"items": [rnd.randint(0, 10 ** 6) for _ in range(100)]} for _ in range(RECORDS // 10)]
+
+
+def _datetime_case(rnd):
+    serializer_class = make_serializer("DatesSerializer", {"created": DateTimeField(),
+                                                           "updated": InternetDateTimeField()}, _model())
+    records = [{"created": "2013-12-30 23:56:{:02d}.431090".format(rnd.randint(0, 59)),
+                "updated": "2015-02-21T14:32:{:02d}.557556Z".format(rnd.randint(0, 59))} for _ in range(RECORDS)]
+    return serializer_class, records
+
+
+def _nested_case(rnd):
+    model = _model()
+    serializer_class = make_serializer("LeafSerializer", {"name": StringField(), "value": IntegerField()}, model)
+    for level in range(3):
+        serializer_class = make_serializer("Nested{}Serializer".format(level), {
+            "name": StringField(),
+            "value": IntegerField(),
+            "child": ObjectField(serializer_class),
+        }, model)
+
+    def make(level):
+        record = {"name": "level{}".format(level), "value": rnd.randint(0, 10 ** 6)}
+        if level:
+            record["child"] = make(level - 1)
+        return record
+
+    return serializer_class, [make(3) for _ in range(RECORDS // 4)]
+
+
+# {scenario: (case, peak bytes per record, retained bytes per record)}
+SCENARIOS = {
+    # Loads without a declared model, into DefaultModel objects.
+    "default_model": (_default_model_case, 125, 125),
+    "list_field": (_list_case, 1000, 1000),
+    "datetimes": (_datetime_case, 200, 200),
+    "nested": (_nested_case, 440, 440),
+    # Views keep the input dicts and lists rather than copying them.
+    "view": (_view_case, 70, 70),
+}
+
+
+def scenario_names():
+    return sorted(SCENARIOS)
+
+
+def measure(name):
+    """
+    Loads the records of a scenario in a new python process and returns a dict with the peak and retained bytes per
+    record.
+    """
+    if tracemalloc is None:
+        raise RuntimeError("tracemalloc is required to measure memory.")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = "import json; from benchmarks import memory; print(json.dumps(memory.measure_in_process({!r})))"
+    output = subprocess.check_output([sys.executable, "-c", script.format(name)], cwd=root)
+    return json.loads(output.decode("utf-8"))
+
+
+def measure_in_process(name):
+    """
+    Loads the records of a scenario in this process and returns a dict with the peak and retained bytes per record.
+    """
+    serializer_class, records = SCENARIOS[name][0](random.Random(SEED))
+
+    # Loading a few records first keeps one-off allocations, like compiled format patterns, out of the figures.
+    for record in records[:10]:
+        serializer_class(data=record).validate()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        objects = []
+        for record in records:
+            s = serializer_class(data=record)
+            s.validate()
+            objects.append(s.object)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    count = float(len(records))
+    return {
+        "records": len(records),
+        "peak_bytes_per_record": (peak - start) / count,
+        "retained_bytes_per_record": (current - start) / count,
+    }
+
+
+def is_reference_version():
+    return sys.version_info[:2] == REFERENCE_VERSION and platform.python_implementation() == "CPython"
+
+
+def check(name, result):
+    """
+    Returns a list of the ways the result exceeds the scenario's budget.
+    """
+    failures = []
+    for metric, budget in zip(("peak_bytes_per_record", "retained_bytes_per_record"), SCENARIOS[name][1:]):
+        limit = budget * (1 + TOLERANCE)
+        if result[metric] > limit:
+            failures.append("{} {}: {:.0f} bytes, budget {} (+{:.0%})".format(
+                name, metric, result[metric], budget, TOLERANCE))
+    return failures
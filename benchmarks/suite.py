@@ -0,0 +1,147 @@
+"""
+The benchmark cases, the runner and the comparison of two sets of results.
+"""
+import platform
+import sys
+import time
+import timeit
+
+from benchmarks import data
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+LIST_SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+QUICK_LIST_SIZES = (10, 100, 1000, 10000)
+NESTING_DEPTHS = range(1, 11)
+WIDTHS = (100, 200)
+
+
+def cases(quick=False):
+    """
+    Returns a list of (name, serializer factory) pairs.  Factories return a serializer class and its records, so data
+    is only generated for the cases that are run.
+    """
+    count = 200 if quick else 1000
+    res = []
+    for field_name in sorted(data.FIELD_CASES):
+        res.append(("fields/{}".format(field_name), lambda f=field_name: data.field_case(f, count)))
+    for depth in NESTING_DEPTHS:
+        res.append(("nesting/depth{}".format(depth), lambda d=depth: data.nested_case(d, count // 2)))
+    for size in (QUICK_LIST_SIZES if quick else LIST_SIZES):
+        res.append(("list/size{}".format(size), lambda s=size: data.list_case(s)))
+    for width in WIDTHS:
+        res.append(("wide/width{}".format(width), lambda w=width: data.wide_case(w, count // 5)))
+    return res
+
+
+def best_time(func, repeat):
+    timer = timeit.default_timer
+    best = None
+    for _ in range(repeat):
+        started = timer()
+        func()
+        elapsed = timer() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def peak_allocated(func):
+    """
+    Returns the peak number of bytes allocated while running func, or None if tracemalloc isn't available.
+    """
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def dump_objects(serializer_class, objects):
+    res = []
+    for obj in objects:
+        s = serializer_class(object=obj)
+        s.validate()
+        res.append(s.data)
+    return res
+
+
+def run_case(serializer_class, records, repeat):
+    objects = data.load_objects(serializer_class, records)
+    count = len(records)
+
+    def load():
+        data.load_objects(serializer_class, records)
+
+    def dump():
+        dump_objects(serializer_class, objects)
+
+    res = {
+        "records": count,
+        "load_per_sec": count / best_time(load, repeat),
+        "dump_per_sec": count / best_time(dump, repeat),
+    }
+    load_peak = peak_allocated(load)
+    if load_peak is not None:
+        res["load_alloc_bytes_per_record"] = float(load_peak) / count
+        res["dump_alloc_bytes_per_record"] = float(peak_allocated(dump)) / count
+    return res
+
+
+def run(quick=False, pattern=None, repeat=None, log=None):
+    """
+    Runs every case whose name contains pattern, and returns the results with some details of the environment.
+    """
+    results = {}
+    for name, factory in cases(quick):
+        if pattern and pattern not in name:
+            continue
+        serializer_class, records = factory()
+        case_repeat = repeat or (3 if quick or name.startswith("list/") else 5)
+        results[name] = run_case(serializer_class, records, case_repeat)
+        if log is not None:
+            log("{}: {:.0f} loads/s, {:.0f} dumps/s".format(name, results[name]["load_per_sec"],
+                                                            results[name]["dump_per_sec"]))
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares two sets of results and returns a list of regressions: throughput that dropped, or allocations that grew,
+    by more than threshold (a fraction of the baseline).  Cases missing from either set are ignored.
+    """
+    regressions = []
+    base_results = baseline["results"]
+    for name, metrics in sorted(current["results"].items()):
+        base_metrics = base_results.get(name)
+        if base_metrics is None:
+            continue
+        for metric, value in sorted(metrics.items()):
+            base_value = base_metrics.get(metric)
+            if not base_value:
+                continue
+            if metric.endswith("_per_sec"):
+                change = (base_value - value) / float(base_value)
+            elif "_alloc_" in metric:
+                change = (value - base_value) / float(base_value)
+            else:
+                continue
+            if change > threshold:
+                regressions.append("{} {}: {:.6g} -> {:.6g} ({:+.1%})".format(
+                    name, metric, base_value, value, (value - base_value) / float(base_value)))
+    return regressions
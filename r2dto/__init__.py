@@ -1,8 +1,14 @@
 from . import fields
 from . import base
 from . import validators
+from . import cache
+from . import binary
+from . import instrumentation
+from . import sampling
+from . import registry
+from . import batch
 
 from .base import (ValidationError, InvalidTypeValidationError, Serializer)
 
-__all__ = ("fields", "base", "validators", "ValidationError",
-           "InvalidTypeValidationError", "Serializer")
+__all__ = ("fields", "base", "validators", "cache", "binary", "instrumentation", "sampling", "registry", "batch",
+           "ValidationError", "InvalidTypeValidationError", "Serializer")
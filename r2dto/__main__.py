@@ -0,0 +1,146 @@
+"""
+Command line tools.
+
+    python -m r2dto validate --serializer pkg.module:SomeSerializer [--workers N] [--fail-fast] [--errors PATH]
+                             [input.ndjson ...]
+
+Validates every record of the NDJSON inputs (or stdin, given as '-' or no inputs at all) against the serializer.
+Invalid records are written as NDJSON to stdout, or to the --errors file, and a report of the throughput, the per
+record latency and the peak memory use is written to stderr.  The exit status is 1 if any record is invalid.
+"""
+import argparse
+import importlib
+import json
+import sys
+import timeit
+
+from .base import ValidationError
+from .ndjson import LatencyHistogram, load_ndjson
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def import_serializer(path):
+    """
+    Imports a serializer class given as 'package.module:ClassName'.
+    """
+    module_name, _, attrs = path.partition(":")
+    if not attrs:
+        raise ValueError("Serializers must be given as 'package.module:ClassName'.  Got {}.".format(path))
+    obj = importlib.import_module(module_name)
+    for attr in attrs.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Stats(object):
+    def __init__(self):
+        self.records = 0
+        self.invalid = 0
+        self.timings = LatencyHistogram()
+
+
+def _validate_stream(serializer_class, name, stream, fail_fast, stats, write_error):
+    timer = timeit.default_timer
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        stats.records += 1
+        started = timer()
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValidationError("Expected a JSON object.  Got {}.".format(type(data)))
+            serializer_class(data=data).validate()
+        except ValidationError as ex:
+            errors = ex.errors
+        except ValueError as ex:
+            errors = ["Invalid JSON: {}".format(ex)]
+        else:
+            errors = None
+        stats.timings.add(timer() - started)
+        if errors:
+            stats.invalid += 1
+            write_error(name, line_number, errors)
+            if fail_fast:
+                return False
+    return True
+
+
+def _validate_file(serializer_class, path, workers, fail_fast, stats, write_error):
+    res = load_ndjson(path, serializer_class, workers=workers, collect=False, fail_fast=fail_fast, timings=True)
+    stats.records += res.count
+    stats.invalid += len(res.errors)
+    stats.timings.merge(res.timings)
+    for line_number, errors in res.errors:
+        write_error(path, line_number, errors)
+    return not (fail_fast and res.errors)
+
+
+def validate(args, stdin, stdout, stderr):
+    serializer_class = import_serializer(args.serializer)
+    error_output = open(args.errors, "w") if args.errors else stdout
+    stats = _Stats()
+
+    def write_error(name, line_number, errors):
+        error_output.write(u"{}\n".format(json.dumps({"input": name, "line": line_number, "errors": errors})))
+
+    started = timeit.default_timer()
+    try:
+        for name in args.inputs or ["-"]:
+            if name == "-":
+                keep_going = _validate_stream(serializer_class, "-", stdin, args.fail_fast, stats, write_error)
+            else:
+                keep_going = _validate_file(serializer_class, name, args.workers, args.fail_fast, stats,
+                                            write_error)
+            if not keep_going:
+                break
+    finally:
+        if error_output is not stdout:
+            error_output.close()
+    elapsed = timeit.default_timer() - started
+
+    stderr.write(u"records: {}\n".format(stats.records))
+    stderr.write(u"invalid: {}\n".format(stats.invalid))
+    stderr.write(u"elapsed: {:.3f}s\n".format(elapsed))
+    stderr.write(u"records/sec: {:.1f}\n".format(stats.records / elapsed if elapsed else 0.0))
+    stderr.write(u"p50 latency: {:.1f}us\n".format(stats.timings.percentile(50) * 1e6))
+    stderr.write(u"p99 latency: {:.1f}us\n".format(stats.timings.percentile(99) * 1e6))
+    peak = peak_rss_bytes()
+    if peak is not None:
+        stderr.write(u"peak rss: {:.1f}MiB\n".format(peak / 1048576.0))
+    return 1 if stats.invalid else 0
+
+
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+    parser = argparse.ArgumentParser(prog="python -m r2dto")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    validate_parser = commands.add_parser("validate", help="validate NDJSON records against a serializer")
+    validate_parser.add_argument("--serializer", required=True, help="the serializer, as package.module:ClassName")
+    validate_parser.add_argument("--workers", type=int, default=1,
+                                 help="the number of worker processes used for each file (stdin is always read in "
+                                      "this process)")
+    validate_parser.add_argument("--fail-fast", action="store_true", help="stop at the first invalid record")
+    validate_parser.add_argument("--errors", help="write the errors to this file rather than stdout")
+    validate_parser.add_argument("inputs", nargs="*", help="NDJSON files to validate, or - for stdin")
+
+    args = parser.parse_args(argv)
+    return validate(args, stdin or sys.stdin, stdout or sys.stdout, stderr or sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
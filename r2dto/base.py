@@ -1,3 +1,11 @@
+import copy
+import itertools
+import os
+import threading
+
+from .registry import register
+
+
 # Copied from the 'six' module.
 def with_metaclass(meta, *bases):
     """Create a base class with a metaclass."""
@@ -27,7 +35,11 @@ class InvalidTypeValidationError(ValidationError):
 
 
 class BaseField(object):
+    # Tracks the order in which fields are declared, since class attributes are not ordered in every python version.
+    _creation_counter = itertools.count()
+
     def __init__(self, name=None, required=False, allow_null=True, validators=None):
+        self.creation_counter = next(BaseField._creation_counter)
         self.name = name
         self.object_field_name = name
         self.required = required
@@ -58,6 +70,117 @@ class BaseField(object):
             return None
         return self.object_to_data(obj)
 
+    def bind(self, parent):
+        """
+        Called with the serializer class declaring the field when that class is created.  Fields holding other fields
+        bind them too, so that nested fields resolve serializer names from the declaring module as well.
+        """
+        self.parent = parent
+
+    def compact_schema(self):
+        """
+        Returns the header describing the positional form of nested data, or None if the field holds a plain value.
+        """
+        return None
+
+    def prepare(self):
+        """
+        Resolves references and builds lookup tables ahead of the first load or dump.  Fields that need any do so
+        lazily as well, so calling this is never required.
+        """
+        pass
+
+    def trusted_converter(self):
+        """
+        Returns the function used to dump non-null values in trusted mode, or None if they are dumped unchanged.
+        Trusted dumps skip type and null checks, so the function should only transform the value.
+        """
+        return self.object_to_data
+
+    def trusted_loader(self):
+        """
+        Returns the function used to load non-null values without validating them, or None if they are loaded
+        unchanged.  It is used for records and list items that are not sampled, and may raise any of
+        CONVERSION_ERRORS, in which case the data is validated in full.
+        """
+        return self.clean
+
+
+_MISSING = object()
+
+# Makes trusted dumps run every check, as untrusted dumps do.  Meant for test suites, and also enabled by setting the
+# R2DTO_CHECK_TRUSTED environment variable.
+CHECK_TRUSTED = bool(os.environ.get("R2DTO_CHECK_TRUSTED"))
+
+# The errors that make loading without validation fall back to full validation.
+CONVERSION_ERRORS = (ValidationError, ValueError, TypeError, AttributeError)
+
+# Guards the per-class preparation.  It is reentrant because preparing a serializer prepares its nested serializers.
+_build_lock = threading.RLock()
+
+
+def _class_cache(cls, attr, build):
+    """
+    Returns the value stored on cls itself under attr, calling build to create it first if needed.  Values are built
+    once, under _build_lock, and never modified afterwards, so they can be shared by every thread.
+    """
+    value = cls.__dict__.get(attr)
+    if value is None:
+        with _build_lock:
+            value = cls.__dict__.get(attr)
+            if value is None:
+                value = build()
+                setattr(cls, attr, value)
+    return value
+
+
+def _clear_class_cache(cls, *attrs):
+    """
+    Drops the values stored on cls by _class_cache under attrs, so that they are built again on next use.
+    """
+    with _build_lock:
+        for attr in attrs:
+            if attr in cls.__dict__:
+                delattr(cls, attr)
+
+
+class _CallState(threading.local):
+    def __init__(self):
+        self.stack = []
+        # The serializers whose compact schema is being built.
+        self.schemas = []
+
+
+_call_state = _CallState()
+
+# Holds an entry for each active serializer, on any thread.  Only its length matters: while it is empty, the
+# thread-local stack does not need to be looked up.
+_active_calls = []
+
+
+def _activate(serializer):
+    _call_state.stack.append(serializer)
+    _active_calls.append(None)
+
+
+def _deactivate():
+    _active_calls.pop()
+    _call_state.stack.pop()
+
+
+def active_serializer():
+    """
+    Returns the serializer currently converting data on this thread, or None.  Nested serializers created by fields
+    (e.g. ObjectField) inherit their per-call options from it.  Serializers only become active if any per-call option
+    is set.
+    """
+    if not _active_calls:
+        return None
+    stack = _call_state.stack
+    if stack:
+        return stack[-1]
+    return None
+
 
 class DefaultMeta(object):
     pass
@@ -67,6 +190,40 @@ class DefaultModel(object):
     pass
 
 
+class DataView(object):
+    """
+    The object loaded by serializers in view mode.  Attributes are read from the input data, except for the values that
+    were converted while loading and the attributes set afterwards, which are kept by the view itself.  The input data
+    is not copied, so it must not be modified while the view is in use.
+    """
+    __slots__ = ("_data", "_names", "_values")
+
+    def __init__(self, data, names):
+        self._data = data
+        self._names = names
+        self._values = None
+
+    def __getattr__(self, attr):
+        if attr in DataView.__slots__:
+            # The slot is not set yet, e.g. while unpickling.
+            raise AttributeError(attr)
+        values = self._values
+        if values is not None and attr in values:
+            return values[attr]
+        try:
+            return self._data[self._names[attr]]
+        except KeyError:
+            raise AttributeError(attr)
+
+    def __setattr__(self, attr, value):
+        if attr in DataView.__slots__:
+            object.__setattr__(self, attr, value)
+            return
+        if self._values is None:
+            self._values = {}
+        self._values[attr] = value
+
+
 class SerializerMetaclass(type):
     def __new__(cls, name, bases, attrs):
         options = DefaultMeta
@@ -81,13 +238,31 @@ class SerializerMetaclass(type):
                     v.name = k
                 v.object_field_name = k
                 fields.append(v)
+        fields.sort(key=lambda field: field.creation_counter)
 
         new_class_attrs = {k: v for k, v in attrs.items() if not isinstance(v, BaseField)}
         new_class_attrs["fields"] = fields
         new_class_attrs["options"] = options
         ret = super(SerializerMetaclass, cls).__new__(cls, name, bases, new_class_attrs)
         for field in fields:
-            field.parent = ret
+            field.bind(ret)
+
+        # The options are resolved once here rather than looked up on every load and dump.
+        ret._model = getattr(options, "model", None)
+        ret._model_init_args = getattr(options, "model_init_args", ())
+        ret._model_init_kwargs = getattr(options, "model_init_kwargs", {})
+        ret._load_cache = getattr(options, "load_cache", None)
+        ret._dump_cache = getattr(options, "dump_cache", None)
+        ret._sampler = getattr(options, "sampler", None)
+        ret.trusted = bool(getattr(options, "trusted", False))
+        ret.view = bool(getattr(options, "view", False))
+        ret._plain = ret._load_cache is None and ret._dump_cache is None and ret._sampler is None and \
+            not (ret.trusted or ret.view)
+        register(ret)
+
+        instrumentation = getattr(options, "instrumentation", None)
+        if instrumentation is not None:
+            instrumentation.instrument(ret)
         return ret
 
 
@@ -95,12 +270,173 @@ class BaseSerializer(object):
     fields = []
     options = None
 
-    def __init__(self, data=None, object=None):
+    # The options resolved from the Meta by SerializerMetaclass.
+    _model = None
+    _model_init_args = ()
+    _model_init_kwargs = {}
+    _load_cache = None
+    _dump_cache = None
+    _sampler = None
+
+    # The per-call options.  Meta.trusted and Meta.view set the defaults of a class, and instances only override them
+    # when an option is passed in or inherited from the active serializer.
+    memo = None
+    compact = False
+    trusted = False
+    view = False
+    # Set while loading a record that was not sampled, so that nested serializers skip validation too.
+    unchecked = False
+    # False if the class or the call sets any option.  Plain serializers skip every option on the way, and are not made
+    # the active serializer while they convert data, as the serializers nested in them have nothing to inherit.
+    _plain = True
+
+    def __init__(self, data=None, object=None, memo=None, compact=None, trusted=None, view=None):
         if data is None and object is None or data is not None and object is not None:
             raise ValueError("Either 'object' or 'data' must be supplied as arguments, but not both.")
         self.data = data
         self.object = object
 
+        if _active_calls or memo is not None or compact or trusted is not None or view is not None:
+            self._set_call_options(active_serializer(), memo, compact, trusted, view)
+
+    def _set_call_options(self, parent, memo, compact, trusted, view):
+        if memo is None and parent is not None:
+            memo = parent.memo
+        elif memo is True:
+            memo = {}
+        elif memo is False:
+            memo = None
+        self.memo = memo
+
+        if compact is None:
+            compact = parent is not None and parent.compact
+        self.compact = compact
+
+        if trusted is None:
+            trusted = self.trusted or parent is not None and parent.trusted
+        self.trusted = trusted
+
+        self.unchecked = parent is not None and parent.unchecked
+
+        if view is None:
+            view = self.view or parent is not None and parent.view
+        self.view = view
+
+        if memo is not None or compact or trusted or view or self.unchecked:
+            self._plain = False
+
+    @classmethod
+    def prepare(cls):
+        """
+        Does the per-class work that is otherwise done on first use: resolves the references of the fields, builds
+        their lookup tables and builds the plans.  Nested serializers are prepared too.
+        """
+        if cls.__dict__.get("_prepared"):
+            return
+        with _build_lock:
+            # False while in progress, so that recursive serializers are only prepared once.
+            if cls.__dict__.get("_prepared") is not None:
+                return
+            cls._prepared = False
+            try:
+                for field in cls.fields:
+                    field.prepare()
+                cls.trusted_plan()
+                cls.trusted_load_plan()
+                cls.view_names()
+            except Exception:
+                del cls._prepared
+                raise
+            cls._prepared = True
+
+    @classmethod
+    def trusted_plan(cls):
+        """
+        Returns the plan used for trusted dumps: a (name, object field name, converter) tuple for each field, where the
+        converter is None for values that are dumped unchanged.  The plan is built on first use.
+        """
+        return _class_cache(cls, "_trusted_plan", lambda: tuple(
+            (field.name, field.object_field_name, field.trusted_converter()) for field in cls.fields))
+
+    @classmethod
+    def trusted_load_plan(cls):
+        """
+        Returns the plan used to load records without validating them: a (name, object field name, loader) tuple for
+        each field, where the loader is None for values that are loaded unchanged.  The plan is built on first use.
+        """
+        return _class_cache(cls, "_trusted_load_plan", lambda: tuple(
+            (field.name, field.object_field_name, field.trusted_loader()) for field in cls.fields))
+
+    @classmethod
+    def view_names(cls):
+        """
+        Returns the dict mapping the object field name of each field to its name in the data, shared by the DataViews
+        of the serializer.  It is built on first use.
+        """
+        return _class_cache(cls, "_view_names", lambda: dict(
+            (field.object_field_name, field.name) for field in cls.fields))
+
+    @classmethod
+    def compact_schema(cls):
+        """
+        Returns the header for the compact form: the field names in declaration order.  Fields holding nested
+        objects are given as a [name, nested header] pair.  A serializer nested within itself, directly or not, is
+        given by its class name where it recurs.
+        """
+        schemas = _call_state.schemas
+        if cls in schemas:
+            return cls.__name__
+        schemas.append(cls)
+        try:
+            schema = []
+            for field in cls.fields:
+                nested = field.compact_schema()
+                schema.append(field.name if nested is None else [field.name, nested])
+        finally:
+            schemas.pop()
+        return schema
+
+    @classmethod
+    def dump_compact(cls, objects):
+        """
+        Converts a list of objects into a dict with the compact schema under "schema" and the records, each a list
+        of values in field order, under "records".
+        """
+        records = []
+        errors = []
+        for i, obj in enumerate(objects):
+            s = cls(object=obj, compact=True)
+            try:
+                s.validate()
+            except ValidationError as ex:
+                errors.append("[{}]: {}".format(i, ex))
+            else:
+                records.append(s.data)
+        if errors:
+            raise ValidationError(errors)
+        return {"schema": cls.compact_schema(), "records": records}
+
+    @classmethod
+    def load_compact(cls, payload):
+        """
+        Converts the output of dump_compact back into a list of objects.
+        """
+        if payload.get("schema") != cls.compact_schema():
+            raise ValidationError("Compact schema does not match {}.".format(cls.__name__))
+        objects = []
+        errors = []
+        for i, record in enumerate(payload.get("records", ())):
+            s = cls(data=record, compact=True)
+            try:
+                s.validate()
+            except ValidationError as ex:
+                errors.append("[{}]: {}".format(i, ex))
+            else:
+                objects.append(s.object)
+        if errors:
+            raise ValidationError(errors)
+        return objects
+
     def validate(self):
         self.base_validate()
 
@@ -111,28 +447,163 @@ class BaseSerializer(object):
             self.object_to_data()
 
     def data_to_object(self):
-        model_class = getattr(self.options, "model", DefaultModel)
-        model_class_args = getattr(self.options, "model_init_args", ())
-        model_class_kwargs = getattr(self.options, "model_init_kwargs", {})
+        if self._plain:
+            self._checked_data_to_object()
+            return
+
+        load_cache = self._load_cache
+        # Records loaded without validation, because they or their parent were not sampled, bypass the cache.
+        if load_cache is not None and not self.unchecked:
+            cache_key = load_cache.key_for_data(self.data)
+            if cache_key is not None:
+                # view and compact change what the same data loads into.
+                cache_key = (type(self), self.view, self.compact, cache_key)
+                obj = load_cache.get(cache_key, _MISSING)
+                if obj is not _MISSING:
+                    self.object = obj
+                    return
+                self._data_to_object()
+                if not self.unchecked:
+                    load_cache.set(cache_key, self.object)
+                    if load_cache.copy:
+                        self.object = copy.deepcopy(self.object)
+                return
+        self._data_to_object()
+
+    def _create_object(self):
+        model_class = self._model
+        if model_class is None:
+            # In view mode, data is loaded as a DataView when no model is declared.
+            if self.view and not self.compact and isinstance(self.data, dict):
+                return DataView(self.data, self.view_names())
+            model_class = DefaultModel
+        return model_class(*self._model_init_args, **self._model_init_kwargs)
+
+    def _data_to_object(self):
+        sampler = self._sampler
+        if sampler is None or self.compact or self.unchecked:
+            if not self.unchecked:
+                self._checked_data_to_object()
+                return
+            sampler = None
+        else:
+            self.unchecked = not sampler.sample()
+
+        fallback = False
+        if self.unchecked:
+            try:
+                self._unchecked_data_to_object()
+                return
+            except CONVERSION_ERRORS:
+                # The record is validated in full to report proper errors.
+                self.unchecked = False
+                fallback = True
+
+        if sampler is None:
+            self._checked_data_to_object()
+            return
+        try:
+            self._checked_data_to_object()
+        except ValidationError:
+            if fallback:
+                sampler.record(detected_errors=1)
+            else:
+                sampler.record(sampled_errors=1)
+            raise
+
+    def _unchecked_data_to_object(self):
+        data = self.data
+        obj = self._create_object()
+        view = type(obj) is DataView
+        _activate(self)
+        try:
+            for name, object_field_name, load in self.trusted_load_plan():
+                try:
+                    value = data[name]
+                except KeyError:
+                    continue
+                if load is not None and value is not None:
+                    loaded = load(value)
+                    # Views already expose the values that loading left unchanged.
+                    if view and loaded is value:
+                        continue
+                    value = loaded
+                elif view:
+                    continue
+                setattr(obj, object_field_name, value)
+        finally:
+            _deactivate()
+        self.object = obj
 
+    def _checked_data_to_object(self):
+        if self.compact:
+            self._compact_data_to_object(self._create_object())
+            return
+
+        data = self.data
         errors = []
         for field in self.fields:
-            if field.required and field.name not in self.data:
+            if field.required and field.name not in data:
                 errors.append("Field {} is missing.".format(field.name))
 
         if errors:
             raise ValidationError(errors)
 
-        obj = model_class(*model_class_args, **model_class_kwargs)
-        for field in self.fields:
-            try:
-                field_obj = field.base_clean(self.data[field.name])
-            except ValidationError as ex:
-                errors.extend(ex.errors)
-            except KeyError:
-                pass
-            else:
-                setattr(obj, field.object_field_name, field_obj)
+        obj = self._create_object()
+        view = type(obj) is DataView
+        plain = self._plain
+        if not plain:
+            _activate(self)
+        try:
+            for field in self.fields:
+                try:
+                    value = data[field.name]
+                    field_obj = field.base_clean(value)
+                except ValidationError as ex:
+                    errors.extend(ex.errors)
+                except KeyError:
+                    pass
+                else:
+                    # Views already expose the values that cleaning left unchanged.
+                    if view and field_obj is value:
+                        continue
+                    setattr(obj, field.object_field_name, field_obj)
+        finally:
+            if not plain:
+                _deactivate()
+
+        if errors:
+            raise ValidationError(errors)
+
+        self.object = obj
+
+    def _compact_data_to_object(self, obj):
+        values = self.data
+        if not isinstance(values, list):
+            raise InvalidTypeValidationError(type(self).__name__, "list", type(values))
+        if len(values) > len(self.fields):
+            raise ValidationError("{} expects at most {} values.  Got {}.".format(
+                type(self).__name__, len(self.fields), len(values)))
+
+        errors = []
+        for field in self.fields[len(values):]:
+            if field.required:
+                errors.append("Field {} is missing.".format(field.name))
+
+        if errors:
+            raise ValidationError(errors)
+
+        _activate(self)
+        try:
+            for field, value in zip(self.fields, values):
+                try:
+                    field_obj = field.base_clean(value)
+                except ValidationError as ex:
+                    errors.extend(ex.errors)
+                else:
+                    setattr(obj, field.object_field_name, field_obj)
+        finally:
+            _deactivate()
 
         if errors:
             raise ValidationError(errors)
@@ -140,27 +611,89 @@ class BaseSerializer(object):
         self.object = obj
 
     def object_to_data(self):
+        if self._plain:
+            self.data = self._fields_to_data(False)
+            return
+
+        memo = self.memo
+        if memo is not None:
+            memo_key = (type(self), id(self.object))
+            entry = memo.get(memo_key)
+            if entry is not None:
+                self.data = entry[1]
+                return
+
+        compact = self.compact
+        dump_cache = None if compact else self._dump_cache
+        if dump_cache is not None:
+            data = dump_cache.get(type(self), self.object)
+            if data is not None:
+                self.data = data
+                if memo is not None:
+                    memo[memo_key] = (self.object, data)
+                return
+
+        if self.trusted and not CHECK_TRUSTED:
+            data = self._trusted_fields_to_data(compact)
+        else:
+            data = self._fields_to_data(compact)
+
+        if memo is not None:
+            # The object is kept alongside the data so that its id cannot be reused while the memo is alive.
+            memo[memo_key] = (self.object, data)
+        if dump_cache is not None:
+            dump_cache.set(type(self), self.object, data)
+        self.data = data
+
+    def _fields_to_data(self, compact):
+        obj = self.object
         errors = []
         for field in self.fields:
-            if field.required and not hasattr(self.object, field.object_field_name):
+            if field.required and not hasattr(obj, field.object_field_name):
                 errors.append("Field {} is missing from object.".format(field.object_field_name))
 
         if errors:
             raise ValidationError(errors)
 
-        data = {}
-        for field in self.fields:
-            try:
-                field_data = field.base_object_to_data(getattr(self.object, field.object_field_name))
-            except ValidationError as ex:
-                errors.extend(ex.errors)
-            else:
-                data[field.name] = field_data
+        data = [] if compact else {}
+        plain = self._plain
+        if not plain:
+            _activate(self)
+        try:
+            for field in self.fields:
+                try:
+                    field_data = field.base_object_to_data(getattr(obj, field.object_field_name))
+                except ValidationError as ex:
+                    errors.extend(ex.errors)
+                else:
+                    if compact:
+                        data.append(field_data)
+                    else:
+                        data[field.name] = field_data
+        finally:
+            if not plain:
+                _deactivate()
 
         if errors:
             raise ValidationError(errors)
+        return data
 
-        self.data = data
+    def _trusted_fields_to_data(self, compact):
+        obj = self.object
+        data = [] if compact else {}
+        _activate(self)
+        try:
+            for name, object_field_name, convert in self.trusted_plan():
+                value = getattr(obj, object_field_name)
+                if convert is not None and value is not None:
+                    value = convert(value)
+                if compact:
+                    data.append(value)
+                else:
+                    data[name] = value
+        finally:
+            _deactivate()
+        return data
 
 
 class Serializer(with_metaclass(SerializerMetaclass, BaseSerializer)):
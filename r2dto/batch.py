@@ -0,0 +1,106 @@
+"""
+Loads and dumps batches of records on a pool of threads.
+
+Serializers may be used by several threads at once.  Fields are only modified while their serializer class is built,
+and the plans and lookup tables built on first use are built once, under a lock, and never modified afterwards.  The
+state of each call lives on the serializer instance and in thread-local storage.  With the GIL, threads help when
+models do I/O in their constructors or properties; free-threaded CPython builds also run the conversions in parallel.
+"""
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+from .base import ValidationError
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+__all__ = ("load_many", "dump_many")
+
+DEFAULT_CHUNK_SIZE = 64
+
+
+def _load_chunk(serializer_class, start, records, options):
+    objects = []
+    errors = []
+    for i, record in enumerate(records, start):
+        s = serializer_class(data=record, **options)
+        try:
+            s.validate()
+        except ValidationError as ex:
+            errors.append("[{}]: {}".format(i, ex))
+        else:
+            objects.append(s.object)
+    return objects, errors
+
+
+def _dump_chunk(serializer_class, start, objects, options):
+    data = []
+    errors = []
+    for i, obj in enumerate(objects, start):
+        s = serializer_class(object=obj, **options)
+        try:
+            s.validate()
+        except ValidationError as ex:
+            errors.append("[{}]: {}".format(i, ex))
+        else:
+            data.append(s.data)
+    return data, errors
+
+
+def _run(convert_chunk, serializer_class, items, workers, executor, chunk_size, options):
+    items = list(items)
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    chunks = [(serializer_class, start, items[start:start + chunk_size], options)
+              for start in range(0, len(items), chunk_size)]
+    if executor is not None:
+        return _gather([executor.submit(convert_chunk, *chunk).result for chunk in chunks])
+
+    workers = workers or multiprocessing.cpu_count()
+    if ThreadPoolExecutor is not None:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return _gather([pool.submit(convert_chunk, *chunk).result for chunk in chunks])
+
+    # Python 2 without the futures backport.
+    pool = ThreadPool(workers)
+    try:
+        return _gather([pool.apply_async(convert_chunk, chunk).get for chunk in chunks])
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _gather(results):
+    res = []
+    errors = []
+    for result in results:
+        chunk_res, chunk_errors = result()
+        res.extend(chunk_res)
+        errors.extend(chunk_errors)
+    if errors:
+        raise ValidationError(errors)
+    return res
+
+
+def load_many(serializer_class, records, workers=None, executor=None, chunk_size=None, **options):
+    """
+    Loads a list of records with serializer_class on a pool of threads and returns the objects, in order.
+
+    :param workers: the number of threads.  Defaults to one per CPU.  Without concurrent.futures, which python 2
+                    needs the 'futures' backport for, a multiprocessing ThreadPool is used.
+    :param executor: a concurrent.futures executor to use instead of a new pool of threads.  It is not shut down.
+    :param chunk_size: the number of records converted by each task.
+    :param options: passed to serializer_class along with each record, e.g. compact=True or view=True.
+
+    ValidationError is raised with every error found, each prefixed with the index of its record.
+    """
+    return _run(_load_chunk, serializer_class, records, workers, executor, chunk_size, options)
+
+
+def dump_many(serializer_class, objects, workers=None, executor=None, chunk_size=None, **options):
+    """
+    Dumps a list of objects with serializer_class on a pool of threads and returns their data, in order.  Takes the
+    same arguments as load_many, e.g. trusted=True.
+    """
+    return _run(_dump_chunk, serializer_class, objects, workers, executor, chunk_size, options)
@@ -0,0 +1,208 @@
+import collections
+import copy
+import hashlib
+import json
+import threading
+import time
+import weakref
+
+__all__ = ("DumpCache", "LoadCache")
+
+_MISSING = object()
+
+_monotonic = getattr(time, "monotonic", time.time)
+
+
+try:
+    _INTEGER_TYPES = (int, long)
+    _TEXT_TYPE = unicode
+except NameError:
+    _INTEGER_TYPES = (int,)
+    _TEXT_TYPE = str
+
+
+def _canonical(data):
+    """
+    Returns a string that identifies the data along with the exact type of every value in it.  Dict entries are sorted,
+    so that the order of the keys does not matter.  TypeError is raised for any other type, including subclasses.
+    """
+    data_type = type(data)
+    if data_type is _TEXT_TYPE:
+        return "s" + json.dumps(data)
+    if data_type is dict:
+        return "{" + ",".join(sorted(_canonical(k) + ":" + _canonical(v) for k, v in data.items())) + "}"
+    if data_type is list:
+        return "[" + ",".join([_canonical(item) for item in data]) + "]"
+    if data is None:
+        return "n"
+    if data_type is bool:
+        return "t" if data else "f"
+    if data_type in _INTEGER_TYPES:
+        return "i" + str(data)
+    if data_type is float:
+        return "r" + repr(data)
+    if data_type is tuple:
+        return "(" + ",".join([_canonical(item) for item in data]) + ")"
+    if data_type is bytes:
+        return "b" + json.dumps(data.decode("latin-1"))
+    raise TypeError("{} cannot be cached.".format(data_type))
+
+
+class DumpCache(object):
+    """
+    Caches dumped data across calls, keyed by serializer class and object identity, along with a version.
+
+    Set an instance as 'dump_cache' on a serializer's Meta.  Objects are tracked with weak references, so entries are
+    dropped as soon as the object is garbage collected.  Objects that cannot be weakly referenced are never cached.
+
+    :param version: callable that accepts the object and returns its current version.  A cached entry is only used if
+                    the version is unchanged since it was stored.  If omitted, objects are assumed to be immutable.
+
+    The cached data is shared between callers, so it must be treated as read only.
+    """
+    def __init__(self, version=None):
+        self.version = version or (lambda obj: None)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, serializer_class, obj):
+        """
+        Returns the data cached for obj as dumped by serializer_class, or None.  Entries are kept per serializer class,
+        so a cache may be shared by serializers that dump the same objects differently.
+        """
+        entry = self._entries.get((serializer_class, id(obj)))
+        if entry is None:
+            return None
+        ref, version, data = entry
+        if ref() is not obj or version != self.version(obj):
+            return None
+        return data
+
+    def set(self, serializer_class, obj, data):
+        key = (serializer_class, id(obj))
+        try:
+            ref = weakref.ref(obj, lambda r: self._discard(key, r))
+        except TypeError:
+            return
+        with self._lock:
+            self._entries[key] = (ref, self.version(obj), data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key, ref):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+
+class LoadCache(object):
+    """
+    Caches loaded objects keyed by a hash of their input.
+
+    Set an instance as 'load_cache' on a serializer's Meta to skip data_to_object for payloads that were already
+    loaded.  The key is a hash of a canonical form of the data that keeps the type of every value.  Use load_bytes to
+    key on the raw input bytes instead, which also skips decoding them.  Payloads that fail validation are never
+    cached.
+
+    :param maxsize: the maximum number of entries.  The least recently used entry is evicted first.
+    :param ttl: the number of seconds an entry stays valid, or None for no expiry.
+    :param copy: if True, a deep copy of the cached object is returned on every hit, so callers may mutate it.
+    :param timer: callable returning the current time in seconds.
+    """
+    def __init__(self, maxsize=128, ttl=None, copy=False, timer=_monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.copy = copy
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for_bytes(raw):
+        if not isinstance(raw, bytes):
+            raw = raw.encode("utf-8")
+        return "b:" + hashlib.sha1(raw).hexdigest()
+
+    @staticmethod
+    def key_for_data(data):
+        """
+        Returns the key for the data, or None if it cannot be cached because it holds values other than dicts, lists,
+        tuples, strings, numbers, booleans and None.  Keys preserve types, so {1: "a"} and {"1": "a"}, or a tuple and
+        a list, get different keys.
+        """
+        try:
+            canonical = _canonical(data)
+        except (TypeError, ValueError, RuntimeError):
+            # RuntimeError is raised for data nested too deeply.
+            return None
+        return "d:" + hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires, obj = entry
+            if expires is not None and expires <= self.timer():
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries[key] = entry
+            self.hits += 1
+        if self.copy:
+            return copy.deepcopy(obj)
+        return obj
+
+    def set(self, key, obj):
+        expires = None
+        if self.ttl is not None:
+            expires = self.timer() + self.ttl
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, obj)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def load_bytes(self, serializer_class, raw, decode=json.loads):
+        """
+        Returns the object loaded from the raw payload by serializer_class, reusing a cached object for identical
+        bytes.  The payload is only decoded on a miss.
+        """
+        key = (serializer_class, self.key_for_bytes(raw))
+        obj = self.get(key, _MISSING)
+        if obj is not _MISSING:
+            return obj
+        s = serializer_class(data=decode(raw))
+        s.validate()
+        self.set(key, s.object)
+        if self.copy:
+            return copy.deepcopy(s.object)
+        return s.object
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._entries),
+        }
+
+    def __len__(self):
+        return len(self._entries)
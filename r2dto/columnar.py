@@ -0,0 +1,152 @@
+"""
+Loads a batch of records into one column per field rather than one object per record.
+
+This module is not imported by the r2dto package, and NumPy is only imported when columns are converted to arrays, so
+that importing r2dto stays fast.
+"""
+from .base import ValidationError
+from .fields import BaseTypeValidatorField, BooleanField, IntegerField, FloatField, _function
+
+__all__ = ("ColumnarResult", "load_columns")
+
+_MISSING = object()
+
+
+class ColumnarResult(object):
+    """
+    The result of load_columns.
+
+    :ivar columns: a dict mapping each field's object field name to the list (or NumPy array) of its values.
+    :ivar null_masks: a dict mapping each field's object field name to a list of booleans, True where the value was
+                      null or missing.
+    :ivar size: the number of records.
+    """
+    def __init__(self, columns, null_masks, size):
+        self.columns = columns
+        self.null_masks = null_masks
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _numpy_dtype(numpy, field):
+    if isinstance(field, BooleanField):
+        return numpy.bool_, False
+    if isinstance(field, IntegerField):
+        return numpy.int64, 0
+    if isinstance(field, FloatField):
+        return numpy.float64, float("nan")
+    return None, None
+
+
+def _to_array(numpy, field, values, mask):
+    dtype, fill = _numpy_dtype(numpy, field)
+    if dtype is None:
+        return values
+    try:
+        return numpy.array([fill if null else value for value, null in zip(values, mask)], dtype=dtype)
+    except OverflowError:
+        return values
+
+
+def _load_column(field, values, errors):
+    """
+    Cleans and validates the values of one field in place, returning the null mask.  Missing values become None.
+    """
+    mask = [value is None or value is _MISSING for value in values]
+    if not any(mask):
+        present = range(len(values))
+    else:
+        present = []
+        for i, value in enumerate(values):
+            if value is _MISSING:
+                if field.required:
+                    errors.append("[{}]: Field {} is missing.".format(i, field.name))
+                values[i] = None
+            elif value is None:
+                if not field.allow_null:
+                    errors.append("[{}]: {}/{} cannot be null/None".format(i, field.name, field.object_field_name))
+            else:
+                present.append(i)
+
+    field_type = type(field)
+    if isinstance(field, BaseTypeValidatorField) and \
+            _function(field_type.clean) is _function(BaseTypeValidatorField.clean):
+        basetypes = field.basetypes
+        bad = [i for i in present if not isinstance(values[i], basetypes)]
+        for i in bad:
+            errors.append("[{}]: {} must be a {}.  Got {}.".format(i, field.name, basetypes, type(values[i])))
+        if bad:
+            bad = set(bad)
+            present = [i for i in present if i not in bad]
+    else:
+        cleaned = []
+        for i in present:
+            try:
+                values[i] = field.clean(values[i])
+            except ValidationError as ex:
+                errors.append("[{}]: {}".format(i, ex))
+            else:
+                cleaned.append(i)
+        present = cleaned
+
+    for validator in field.validators:
+        validate_many = getattr(validator, "validate_many", None)
+        if validate_many is not None:
+            for k, message in validate_many(field, [values[i] for i in present]):
+                errors.append("[{}]: {}".format(present[k], ValidationError(message)))
+            continue
+        for i in present:
+            try:
+                validator.validate(field, values[i])
+            except ValidationError as ex:
+                errors.append("[{}]: {}".format(i, ex))
+
+    return mask
+
+
+def load_columns(serializer_class, records, use_numpy=True):
+    """
+    Validates a list of record dicts against serializer_class and returns a ColumnarResult.
+
+    Each field is checked over the whole column at once, so the per record cost is a single dict lookup per field.
+    Missing values are treated as nulls.  If NumPy is installed and use_numpy is True, the columns of BooleanFields,
+    IntegerFields and FloatFields are returned as NumPy arrays, with nulls filled with False, 0 and NaN respectively.
+
+    ValidationError is raised with every error found, each prefixed with the index of its record.
+    """
+    records = list(records)
+    errors = []
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append("[{}]: Expected a dict.  Got {}.".format(i, type(record)))
+    if errors:
+        raise ValidationError(errors)
+
+    columns = {}
+    null_masks = {}
+    for field in serializer_class.fields:
+        name = field.name
+        values = [record.get(name, _MISSING) for record in records]
+        columns[field.object_field_name] = values
+        null_masks[field.object_field_name] = _load_column(field, values, errors)
+
+    if errors:
+        raise ValidationError(errors)
+
+    numpy = _import_numpy() if use_numpy else None
+    if numpy is not None:
+        for field in serializer_class.fields:
+            name = field.object_field_name
+            columns[name] = _to_array(numpy, field, columns[name], null_masks[name])
+
+    return ColumnarResult(columns, null_masks, len(records))
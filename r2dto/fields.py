@@ -1,17 +1,37 @@
 import datetime
+import functools
+import operator
 import re
 import uuid
 
-from .base import ValidationError, InvalidTypeValidationError, BaseField
+from .base import ValidationError, InvalidTypeValidationError, BaseField, active_serializer, CONVERSION_ERRORS
+from .registry import get_serializer
+
+try:
+    basestring
+except NameError:
+    basestring = str
 
 __all__ = ("Field", "StringField", "BooleanField", "IntegerField", "FloatField",
-           "ObjectField", "ListField", "DateTimeField", "InternetDateTimeField", "DateField", "TimeField", "UuidField")
+           "ObjectField", "ListField", "DictField", "UnionField", "DateTimeField", "InternetDateTimeField",
+           "DateField", "TimeField", "UuidField")
 
 TIME_TOKEN_STRIPPER_PATTERN = re.compile(r"[:]|([-](?!((\d{2}[:]\d{2})|(\d{4}))$))")
 
 Field = BaseField
 
 
+def _function(method):
+    return getattr(method, "__func__", method)
+
+
+def _overrides(field, cls, method_name):
+    """
+    Returns True if the field's class overrides the method defined by cls.
+    """
+    return _function(getattr(type(field), method_name)) is not _function(getattr(cls, method_name))
+
+
 class BaseTypeValidatorField(object):
     basetypes = ()
 
@@ -25,6 +45,16 @@ class BaseTypeValidatorField(object):
             raise InvalidTypeValidationError(self.object_field_name, str(self.basetypes), type(obj))
         return obj
 
+    def trusted_converter(self):
+        if _overrides(self, BaseTypeValidatorField, "object_to_data"):
+            return self.object_to_data
+        return None
+
+    def trusted_loader(self):
+        if _overrides(self, BaseTypeValidatorField, "clean"):
+            return self.clean
+        return None
+
 
 class StringField(BaseTypeValidatorField, BaseField):
     """
@@ -67,22 +97,46 @@ class ObjectField(BaseField):
     """
     Represents an more complex object field.
 
-    Specify the serializer to user as the argument to serialzer_class.
+    Specify the serializer to user as the argument to serialzer_class.  It may also be given as the name of the
+    serializer class, which is looked up with r2dto.registry.get_serializer when first needed.  This lets serializers
+    refer to serializers that are defined later, or to each other.
     """
     def __init__(self, serializer_class, *args, **kwargs):
         super(ObjectField, self).__init__(*args, **kwargs)
-        self.serializer_class = serializer_class
+        # Names are resolved on first use.  Loads and dumps only have to check that the class is set.
+        if isinstance(serializer_class, basestring):
+            self._serializer_name = serializer_class
+            self._serializer_class = None
+        else:
+            self._serializer_name = None
+            self._serializer_class = serializer_class
+
+    @property
+    def serializer_class(self):
+        serializer_class = self._serializer_class
+        if serializer_class is None:
+            module = self.parent.__module__ if self.parent is not None else None
+            serializer_class = get_serializer(self._serializer_name, module)
+            _instrument_resolved(self, (serializer_class,))
+            self._serializer_class = serializer_class
+        return serializer_class
+
+    def prepare(self):
+        self.serializer_class.prepare()
 
     def clean(self, data):
-        s = self.serializer_class(data=data)
+        s = (self._serializer_class or self.serializer_class)(data=data)
         s.validate()
         return s.object
 
     def object_to_data(self, obj):
-        s = self.serializer_class(object=obj)
+        s = (self._serializer_class or self.serializer_class)(object=obj)
         s.validate()
         return s.data
 
+    def compact_schema(self):
+        return self.serializer_class.compact_schema()
+
 
 class ListField(BaseField):
     """
@@ -90,36 +144,150 @@ class ListField(BaseField):
 
     :param allowed_types: is either a list or tuple of Field types that are allowed in the list.  If just a field is
                           provided, then it is the only type allowed.
+    :param sampler: an r2dto.sampling.Sampler.  If given and there is a single allowed type, only the items chosen by
+                    the sampler are fully validated and the rest are only converted.
     """
     def __init__(self, allowed_types, *args, **kwargs):
+        self.sampler = kwargs.pop("sampler", None)
         super(ListField, self).__init__(*args, **kwargs)
         if isinstance(allowed_types, BaseField):
             allowed_types = (allowed_types,)
         self.allowed_types = tuple(allowed_types)
+        self.plain_items = len(self.allowed_types) == 1 and _is_plain_type_field(self.allowed_types[0])
 
     def clean(self, data):
         if not isinstance(data, list):
             raise InvalidTypeValidationError(self.name, "list", type(data))
 
+        if self.sampler is not None and len(self.allowed_types) == 1:
+            return self._sampled_clean(data, self.sampler)
+
+        # In view mode, lists whose items are left unchanged are returned as they are rather than copied.
+        parent = active_serializer()
+        view = parent is not None and parent.view
+        if self.plain_items:
+            basetypes = self.allowed_types[0].basetypes
+            if all(isinstance(item, basetypes) for item in data):
+                return data if view else list(data)
+
+        res = None
+        if len(self.allowed_types) == 1 and not self.allowed_types[0].validators:
+            clean = self.allowed_types[0].clean
+            try:
+                res = [clean(item) for item in data]
+            except ValidationError:
+                # The items are cleaned again below to report every error.
+                pass
+        if res is None:
+            res, errors = self._clean_items(data, range(len(data)))
+            if errors:
+                raise ValidationError([error for _, error in errors])
+        if view and all(obj is item for obj, item in zip(res, data)):
+            return data
+        return res
+
+    def _clean_items(self, items, positions):
+        """
+        Cleans and validates the items, whose positions in the data are given for error messages.  Returns the cleaned
+        items and a list of (position, error) pairs, sorted by position.
+        """
         res = []
         errors = []
-        for item_i, item in enumerate(data):
+        if len(self.allowed_types) == 1:
+            allowed_type = self.allowed_types[0]
+            cleaned = []
+            for item_i, item in zip(positions, items):
+                try:
+                    res.append(allowed_type.clean(item))
+                except ValidationError as ex:
+                    errors.append((item_i, '{}[{}]: {}'.format(self.name, item_i, ex)))
+                else:
+                    cleaned.append(item_i)
+            if allowed_type.validators:
+                errors.extend(self.validate_items(res, cleaned))
+                errors.sort(key=operator.itemgetter(0))
+            return res, errors
+
+        # Each item gets the first allowed type that both cleans and validates it, so items are validated one by one.
+        for item_i, item in zip(positions, items):
             item_errors = list()
             for allowed_type in self.allowed_types:
                 try:
                     obj = allowed_type.clean(item)
+                    for validator in allowed_type.validators:
+                        validator.validate(allowed_type, obj)
                 except ValidationError as ex:
-                    item_errors.append('{}[{}]: {}'.format(self.name, item_i, ex))
+                    item_errors.append((item_i, '{}[{}]: {}'.format(self.name, item_i, ex)))
                 else:
                     res.append(obj)
                     item_errors = list()
                     break
             errors.extend(item_errors)
+        return res, errors
+
+    def _sampled_clean(self, data, sampler):
+        load = self.allowed_types[0].trusted_loader()
+        res = list(data)
+        checked = []
+        fallbacks = set()
+        for item_i, item in enumerate(data):
+            if sampler.sample():
+                checked.append(item_i)
+            elif load is not None:
+                try:
+                    res[item_i] = load(item)
+                except CONVERSION_ERRORS:
+                    checked.append(item_i)
+                    fallbacks.add(item_i)
+        if not checked:
+            return res
+
+        cleaned, errors = self._clean_items([data[item_i] for item_i in checked], checked)
+        failed = set(item_i for item_i, _ in errors)
+        sampler.record(sampled_errors=len(failed - fallbacks), detected_errors=len(failed & fallbacks))
         if errors:
-            raise ValidationError(errors)
+            raise ValidationError([error for _, error in errors])
+        for item_i, obj in zip(checked, cleaned):
+            res[item_i] = obj
         return res
 
+    def validate_items(self, items, positions):
+        """
+        Runs the validators of the single allowed type over the items it cleaned, a whole list at a time for validators
+        that have a 'validate_many' method.  'positions' holds the position in the data of each item.  Returns a list of
+        (position, error) pairs.
+        """
+        allowed_type = self.allowed_types[0]
+        errors = []
+        for validator in allowed_type.validators:
+            failed = []
+            validate_many = getattr(validator, "validate_many", None)
+            if validate_many is not None:
+                failed.extend((k, ValidationError(message)) for k, message in validate_many(allowed_type, items))
+            else:
+                for k, item in enumerate(items):
+                    try:
+                        validator.validate(allowed_type, item)
+                    except ValidationError as ex:
+                        failed.append((k, ex))
+            if not failed:
+                continue
+            errors.extend((positions[k], '{}[{}]: {}'.format(self.name, positions[k], ex)) for k, ex in failed)
+            # As with base_clean, an item is only reported by the first validator it fails.
+            rejected = set(k for k, _ in failed)
+            positions = [item_i for k, item_i in enumerate(positions) if k not in rejected]
+            items = [item for k, item in enumerate(items) if k not in rejected]
+        return errors
+
     def object_to_data(self, obj):
+        if len(self.allowed_types) == 1:
+            convert = self.allowed_types[0].object_to_data
+            try:
+                return [convert(item) for item in obj]
+            except ValidationError:
+                # The items are converted again below to report every error.
+                pass
+
         res = []
         errors = []
         for item_i, item in enumerate(obj):
@@ -138,6 +306,289 @@ class ListField(BaseField):
             raise ValidationError(errors)
         return res
 
+    def bind(self, parent):
+        super(ListField, self).bind(parent)
+        for allowed_type in self.allowed_types:
+            _name_item_field(allowed_type, self)
+            allowed_type.bind(parent)
+
+    def prepare(self):
+        for allowed_type in self.allowed_types:
+            allowed_type.prepare()
+
+    def compact_schema(self):
+        if len(self.allowed_types) != 1:
+            return None
+        nested = self.allowed_types[0].compact_schema()
+        if nested is None:
+            return None
+        return [nested]
+
+    def trusted_converter(self):
+        # With several allowed types, the type checks are what select the type of each item.
+        if len(self.allowed_types) != 1 or _overrides(self, ListField, "object_to_data"):
+            return self.object_to_data
+        convert = self.allowed_types[0].trusted_converter()
+        if convert is None:
+            return list
+        return functools.partial(_map_list, convert)
+
+    def trusted_loader(self):
+        if len(self.allowed_types) != 1 or _overrides(self, ListField, "clean"):
+            return self.clean
+        load = self.allowed_types[0].trusted_loader()
+        if load is None:
+            return _copy_list
+        return functools.partial(_load_list, load)
+
+
+def _instrument_resolved(field, serializer_classes):
+    # Serializers referred to by name are instrumented along with the serializer declaring the field once they are
+    # resolved, which is when the field is first used or prepared.
+    instrumentation = field.parent.__dict__.get("_instrumentation") if field.parent is not None else None
+    if instrumentation is not None and field.parent._instrument_nested:
+        for serializer_class in serializer_classes:
+            instrumentation.instrument(serializer_class)
+
+
+def _name_item_field(field, container):
+    # Item fields are not declared on a serializer, so their errors are reported under the name of their container.
+    if field.name is None:
+        field.name = container.name
+        field.object_field_name = container.object_field_name
+
+
+def _map_list(convert, items):
+    return [convert(item) for item in items]
+
+
+# The loaders of unchecked lists raise TypeError for anything else than a list, so that the record is validated in full
+# rather than, say, a string being loaded as a list of its characters.
+def _copy_list(items):
+    if not isinstance(items, list):
+        raise TypeError("Expected a list.  Got {}.".format(type(items)))
+    return list(items)
+
+
+def _load_list(load, items):
+    if not isinstance(items, list):
+        raise TypeError("Expected a list.  Got {}.".format(type(items)))
+    return [load(item) for item in items]
+
+
+def _is_plain_type_field(field):
+    """
+    Returns True if the field does nothing but check the type of its values, so that a whole collection of values can
+    be checked with isinstance and passed through unchanged.
+    """
+    field_type = type(field)
+    return (isinstance(field, BaseTypeValidatorField) and not field.validators and
+            _function(field_type.clean) is _function(BaseTypeValidatorField.clean) and
+            _function(field_type.object_to_data) is _function(BaseTypeValidatorField.object_to_data))
+
+
+class DictField(BaseField):
+    """
+    Represents a dict with typed keys and values.
+
+    :param key_field: the field used for every key.
+    :param value_field: the field used for every value.
+    :param min_size: the minimum number of entries, if any.
+    :param max_size: the maximum number of entries, if any.
+
+    If both fields only check the type of their data, the whole dict is checked at once and no per-entry conversion
+    is done unless a type doesn't match.
+    """
+    def __init__(self, key_field, value_field, min_size=None, max_size=None, *args, **kwargs):
+        super(DictField, self).__init__(*args, **kwargs)
+        self.key_field = key_field
+        self.value_field = value_field
+        self.min_size = min_size
+        self.max_size = max_size
+        self.plain_keys = _is_plain_type_field(key_field)
+        self.plain_values = _is_plain_type_field(value_field)
+
+    def bind(self, parent):
+        super(DictField, self).bind(parent)
+        _name_item_field(self.key_field, self)
+        _name_item_field(self.value_field, self)
+        self.key_field.bind(parent)
+        self.value_field.bind(parent)
+
+    def prepare(self):
+        self.key_field.prepare()
+        self.value_field.prepare()
+
+    def check_size(self, data):
+        if self.min_size is not None and len(data) < self.min_size:
+            raise ValidationError("{} must have at least {} entries.  Got {}.".format(
+                self.name, self.min_size, len(data)))
+        if self.max_size is not None and len(data) > self.max_size:
+            raise ValidationError("{} must have at most {} entries.  Got {}.".format(
+                self.name, self.max_size, len(data)))
+
+    def clean(self, data):
+        if not isinstance(data, dict):
+            raise InvalidTypeValidationError(self.name, "dict", type(data))
+        self.check_size(data)
+        return self._convert(data, "base_clean")
+
+    def object_to_data(self, obj):
+        if not isinstance(obj, dict):
+            raise InvalidTypeValidationError(self.object_field_name, "dict", type(obj))
+        self.check_size(obj)
+        return self._convert(obj, "base_object_to_data")
+
+    def _convert(self, data, method_name):
+        keys_match = self.plain_keys and all(isinstance(key, self.key_field.basetypes) for key in data)
+        values_match = self.plain_values and all(isinstance(value, self.value_field.basetypes)
+                                                 for value in data.values())
+        if keys_match and values_match:
+            return dict(data)
+
+        convert_key = getattr(self.key_field, method_name)
+        convert_value = getattr(self.value_field, method_name)
+        res = {}
+        errors = []
+        for key, value in data.items():
+            try:
+                if not keys_match:
+                    key = convert_key(key)
+                if not values_match:
+                    value = convert_value(value)
+            except ValidationError as ex:
+                errors.append('{}[{}]: {}'.format(self.name, key, ex))
+            else:
+                res[key] = value
+        if errors:
+            raise ValidationError(errors)
+        return res
+
+    def compact_schema(self):
+        nested = self.value_field.compact_schema()
+        if nested is None:
+            return None
+        return {"*": nested}
+
+
+class UnionField(BaseField):
+    """
+    Represents an object that may be one of several types, selected by a discriminator key in the data.
+
+    :param serializers: a dict mapping each discriminator value to the serializer class for that variant.  Serializer
+                        classes may be given by name, as with ObjectField.
+    :param discriminator: the key holding the discriminator value.  Defaults to "type".
+
+    When converting objects to data, the variant is selected by the class of the object, using the model declared in
+    each serializer's Meta.  Objects whose class is not a declared model are looked up by their discriminator
+    attribute instead.  Objects loaded by a variant without a model are given that attribute, so that they can be
+    converted back.
+
+    In compact mode each value is a [discriminator value, record] pair.
+    """
+    def __init__(self, serializers, discriminator="type", *args, **kwargs):
+        super(UnionField, self).__init__(*args, **kwargs)
+        self._serializers = dict(serializers)
+        self._resolved = False
+        self._tags_by_model = None
+        self.discriminator = discriminator
+
+    @property
+    def serializers(self):
+        if not self._resolved:
+            module = self.parent.__module__ if self.parent is not None else None
+            self._serializers = dict(
+                (tag, get_serializer(serializer_class, module) if isinstance(serializer_class, basestring)
+                 else serializer_class)
+                for tag, serializer_class in self._serializers.items())
+            _instrument_resolved(self, self._serializers.values())
+            self._resolved = True
+        return self._serializers
+
+    @property
+    def tags_by_model(self):
+        tags_by_model = self._tags_by_model
+        if tags_by_model is None:
+            tags_by_model = {}
+            for tag, serializer_class in self.serializers.items():
+                model = getattr(serializer_class.options, "model", None)
+                if model is not None:
+                    tags_by_model.setdefault(model, tag)
+            self._tags_by_model = tags_by_model
+        return tags_by_model
+
+    def prepare(self):
+        for serializer_class in self.serializers.values():
+            serializer_class.prepare()
+        self.tags_by_model
+
+    def clean(self, data):
+        parent = active_serializer()
+        if parent is not None and parent.compact:
+            if not isinstance(data, list) or len(data) != 2:
+                raise InvalidTypeValidationError(self.name, "[{}, record] pair".format(self.discriminator),
+                                                 type(data))
+            tag, data = data
+        elif not isinstance(data, dict):
+            raise InvalidTypeValidationError(self.name, "dict", type(data))
+        else:
+            tag = data.get(self.discriminator)
+
+        try:
+            serializer_class = self.serializers[tag]
+        except (KeyError, TypeError):
+            raise ValidationError("{}.{} must be one of {}.  Got {}.".format(
+                self.name, self.discriminator, tuple(self.serializers), tag))
+        s = serializer_class(data=data)
+        s.validate()
+        obj = s.object
+        if serializer_class._model is None and not hasattr(obj, self.discriminator):
+            setattr(obj, self.discriminator, tag)
+        return obj
+
+    def object_to_data(self, obj):
+        tag = self._tag_for_object(obj)
+        try:
+            serializer_class = self.serializers[tag]
+        except (KeyError, TypeError):
+            raise InvalidTypeValidationError(self.name, "one of {}".format(tuple(self.serializers)), type(obj))
+
+        s = serializer_class(object=obj)
+        s.validate()
+        data = s.data
+        if s.compact:
+            return [tag, data]
+        if self.discriminator not in data:
+            # The dumped data may be shared through a memo or dump cache, so it is copied rather than updated.
+            data = dict(data)
+            data[self.discriminator] = tag
+        return data
+
+    def compact_schema(self):
+        return dict((tag, serializer_class.compact_schema()) for tag, serializer_class in self.serializers.items())
+
+    def _tag_for_object(self, obj):
+        obj_type = type(obj)
+        try:
+            return self.tags_by_model[obj_type]
+        except KeyError:
+            pass
+
+        for base in obj_type.__mro__[1:]:
+            if base in self.tags_by_model:
+                tag = self.tags_by_model[base]
+                # The table is replaced rather than updated, so that other threads never see it change.
+                tags_by_model = dict(self.tags_by_model)
+                tags_by_model[obj_type] = tag
+                self._tags_by_model = tags_by_model
+                return tag
+
+        return getattr(obj, self.discriminator, None)
+
+
+def _strptime(fmt, s):
+    return datetime.datetime.strptime(s, fmt)
+
 
 def _default_parse_internet_datetime_string_function(s):
     stripped = re.sub(TIME_TOKEN_STRIPPER_PATTERN, "", s)
@@ -169,7 +620,7 @@ class DateTimeField(StringField):
     def __init__(self, fmt=None, parse=None, *args, **kwargs):
         super(DateTimeField, self).__init__(*args, **kwargs)
         self.fmt = fmt or self.default_fmt
-        self.parse = parse or (lambda s: datetime.datetime.strptime(s, self.fmt))
+        self.parse = parse or functools.partial(_strptime, self.fmt)
 
     def clean(self, data):
         data = super(DateTimeField, self).clean(data)
@@ -186,6 +637,11 @@ class DateTimeField(StringField):
             raise InvalidTypeValidationError(self.name, "datetime", type(obj))
         return obj.strftime(self.fmt)
 
+    def trusted_converter(self):
+        if _overrides(self, DateTimeField, "object_to_data"):
+            return self.object_to_data
+        return operator.methodcaller("strftime", self.fmt)
+
 
 class InternetDateTimeField(DateTimeField):
     """
@@ -198,10 +654,19 @@ class InternetDateTimeField(DateTimeField):
     def object_to_data(self, obj):
         if not isinstance(obj, self.instance_type):
             raise InvalidTypeValidationError(self.name, "datetime", type(obj))
-        if obj.tzinfo:
-            return obj.isoformat()
-        else:
-            return obj.isoformat() + "Z"
+        return _internet_datetime_string(obj)
+
+    def trusted_converter(self):
+        if _overrides(self, InternetDateTimeField, "object_to_data"):
+            return self.object_to_data
+        return _internet_datetime_string
+
+
+def _internet_datetime_string(obj):
+    if obj.tzinfo:
+        return obj.isoformat()
+    else:
+        return obj.isoformat() + "Z"
 
 
 class DateField(DateTimeField):
@@ -247,3 +712,13 @@ class UuidField(StringField):
         if not isinstance(obj, uuid.UUID):
             raise InvalidTypeValidationError(self.name, "uuid", type(obj))
         return str(obj)
+
+    def trusted_converter(self):
+        if _overrides(self, UuidField, "object_to_data"):
+            return self.object_to_data
+        return str
+
+    def trusted_loader(self):
+        if _overrides(self, UuidField, "clean"):
+            return self.clean
+        return uuid.UUID
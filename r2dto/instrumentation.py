@@ -0,0 +1,199 @@
+"""
+Opt-in timing and counters for serializers and their fields.
+
+Instrumenting a serializer replaces its data_to_object and object_to_data methods, and the base_clean and
+base_object_to_data methods of its fields, with timed versions.  Trusted dumps, and loads of records that are not
+sampled, convert values through the serializer's plans rather than these methods, so the plans are rebuilt with timed
+converters.  Serializers and fields that are not instrumented keep their plain methods, so instrumentation costs
+nothing unless it is configured.
+"""
+import threading
+import timeit
+
+from .base import ValidationError, _build_lock, _clear_class_cache
+
+__all__ = ("Instrumentation",)
+
+LOAD = "load"
+DUMP = "dump"
+FIELD_LOAD = "field_load"
+FIELD_DUMP = "field_dump"
+
+_SERIALIZER_METHODS = (("data_to_object", LOAD), ("object_to_data", DUMP))
+_FIELD_METHODS = (("base_clean", FIELD_LOAD), ("base_object_to_data", FIELD_DUMP))
+# The field methods returning the converters compiled into the plans, and the plans they are compiled into.
+_PLAN_METHODS = (("trusted_converter", FIELD_DUMP), ("trusted_loader", FIELD_LOAD))
+_PLANS = ("_trusted_plan", "_trusted_load_plan")
+
+
+def _unchanged(value):
+    return value
+
+
+def _nested_serializers(field):
+    # Names that are not resolved yet are left alone: resolving them now, before their module may have defined them,
+    # could find a serializer of the same name in another module.  They are instrumented when they are resolved.
+    serializer_class = getattr(field, "_serializer_class", None)
+    if serializer_class is not None:
+        yield serializer_class
+    if getattr(field, "_resolved", False):
+        for serializer_class in field.serializers.values():
+            yield serializer_class
+    for nested in getattr(field, "allowed_types", ()):
+        for serializer_class in _nested_serializers(nested):
+            yield serializer_class
+    for attr in ("key_field", "value_field"):
+        nested = getattr(field, attr, None)
+        if nested is not None:
+            for serializer_class in _nested_serializers(nested):
+                yield serializer_class
+
+
+class Instrumentation(object):
+    """
+    A registry of hooks and aggregated counters.
+
+    Set an instance as 'instrumentation' on a serializer's Meta, or call instrument() on serializer classes, to record
+    every load and dump of the serializer and of each of its fields.  Each event is recorded under its kind ("load",
+    "dump", "field_load" or "field_dump") and a path: the serializer's name, followed by the field name for fields.
+
+    Hooks are callables accepting (kind, path, elapsed seconds, error), where error is True if a ValidationError was
+    raised.  They are called after every event.
+    """
+    def __init__(self, timer=timeit.default_timer):
+        self.timer = timer
+        self.hooks = []
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def record(self, kind, path, elapsed, error):
+        key = (kind, path)
+        with self._lock:
+            counter = self.counters.get(key)
+            if counter is None:
+                counter = self.counters[key] = [0, 0.0, 0.0, 0]
+            counter[0] += 1
+            counter[1] += elapsed
+            if elapsed > counter[2]:
+                counter[2] = elapsed
+            if error:
+                counter[3] += 1
+        for hook in self.hooks:
+            hook(kind, path, elapsed, error)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+
+    def as_dict(self):
+        """
+        Returns the counters as {kind: {path: {"calls", "total_seconds", "max_seconds", "errors"}}}.
+        """
+        res = {}
+        with self._lock:
+            for (kind, path), (calls, total, maximum, errors) in self.counters.items():
+                res.setdefault(kind, {})[path] = {
+                    "calls": calls,
+                    "total_seconds": total,
+                    "max_seconds": maximum,
+                    "errors": errors,
+                }
+        return res
+
+    def to_prometheus(self, prefix="r2dto"):
+        """
+        Returns the counters in the Prometheus text exposition format.
+        """
+        with self._lock:
+            items = sorted(self.counters.items())
+        metrics = (("calls_total", "counter", 0), ("seconds_total", "counter", 1), ("max_seconds", "gauge", 2),
+                   ("errors_total", "counter", 3))
+        lines = []
+        for name, metric_type, index in metrics:
+            lines.append("# TYPE {}_{} {}".format(prefix, name, metric_type))
+            for (kind, path), counter in items:
+                lines.append('{}_{}{{kind="{}",path="{}"}} {}'.format(prefix, name, kind, path, counter[index]))
+        return "\n".join(lines) + "\n"
+
+    def instrument(self, serializer_class, recursive=True):
+        """
+        Records the loads and dumps of serializer_class and its fields.  With recursive, the serializers nested in
+        its fields are instrumented too, including those referred to by name once the names are resolved.
+        """
+        # Names may be resolved, and their serializers instrumented, by several threads at once.
+        with _build_lock:
+            if serializer_class.__dict__.get("_instrumentation") is not None:
+                return
+            serializer_class._instrument_nested = recursive
+            serializer_class._instrumentation = self
+        serializer_class._uninstrumented_methods = dict((method_name, serializer_class.__dict__.get(method_name))
+                                                        for method_name, _ in _SERIALIZER_METHODS)
+
+        path = serializer_class.__name__
+        for method_name, kind in _SERIALIZER_METHODS:
+            setattr(serializer_class, method_name,
+                    self._timed_function(getattr(serializer_class, method_name), kind, path))
+
+        for field in serializer_class.fields:
+            field_path = "{}.{}".format(path, field.name)
+            for method_name, kind in _FIELD_METHODS:
+                # Instance attributes shadow the class's methods, leaving other instances of the field class alone.
+                setattr(field, method_name, self._timed_function(getattr(field, method_name), kind, field_path))
+            for method_name, kind in _PLAN_METHODS:
+                setattr(field, method_name, self._timed_plan_method(getattr(field, method_name), kind, field_path))
+            if recursive:
+                for nested in _nested_serializers(field):
+                    self.instrument(nested)
+        _clear_class_cache(serializer_class, *_PLANS)
+
+    def uninstrument(self, serializer_class, recursive=True):
+        if serializer_class.__dict__.get("_instrumentation") is not self:
+            return
+        for method_name, method in serializer_class._uninstrumented_methods.items():
+            if method is None:
+                delattr(serializer_class, method_name)
+            else:
+                setattr(serializer_class, method_name, method)
+        del serializer_class._instrumentation
+        del serializer_class._instrument_nested
+        del serializer_class._uninstrumented_methods
+        for field in serializer_class.fields:
+            for method_name, _ in _FIELD_METHODS + _PLAN_METHODS:
+                delattr(field, method_name)
+            if recursive:
+                for nested in _nested_serializers(field):
+                    self.uninstrument(nested)
+        _clear_class_cache(serializer_class, *_PLANS)
+
+    def _timed_plan_method(self, method, kind, path):
+        """
+        Wraps a method returning a converter, such as trusted_loader, so that it returns a timed converter.  Values
+        that are passed through unchanged are timed too.  Null values are never converted, so they are not recorded.
+        """
+        def timed_method():
+            return self._timed_function(method() or _unchanged, kind, path)
+
+        return timed_method
+
+    def _timed_function(self, function, kind, path):
+        timer = self.timer
+        record = self.record
+
+        def timed(*args):
+            started = timer()
+            error = False
+            try:
+                return function(*args)
+            except ValidationError:
+                error = True
+                raise
+            finally:
+                record(kind, path, timer() - started, error)
+
+        return timed
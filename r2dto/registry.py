@@ -0,0 +1,67 @@
+"""
+Tracks every serializer class by name, so that fields can refer to serializers that are not defined yet.
+"""
+import threading
+import weakref
+
+__all__ = ("register", "get_serializer", "registered_serializers", "warm_up")
+
+_serializers = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+
+
+def _key(serializer_class):
+    # Python 2 classes have no __qualname__, so a class defined in a function replaces any other of the same name in
+    # its module.
+    name = getattr(serializer_class, "__qualname__", serializer_class.__name__)
+    return "{}.{}".format(serializer_class.__module__, name)
+
+
+def register(serializer_class):
+    """
+    Registers a serializer class.  Serializer classes are registered when they are created.  Classes are only weakly
+    referenced, so registering them does not keep them alive.
+    """
+    with _lock:
+        _serializers[_key(serializer_class)] = serializer_class
+
+
+def registered_serializers():
+    with _lock:
+        return list(_serializers.values())
+
+
+def get_serializer(name, module=None):
+    """
+    Returns the serializer class registered under name, which is either the full name of the class, such as
+    'package.module.ClassName', or the class name alone.  A class name is looked up in module first, if given, and
+    then among all the registered classes, where it must be unique.
+
+    LookupError is raised if there is no such class, or if the class name is ambiguous.
+    """
+    with _lock:
+        serializer_class = _serializers.get(name)
+        if serializer_class is None and module is not None:
+            serializer_class = _serializers.get("{}.{}".format(module, name))
+        if serializer_class is not None:
+            return serializer_class
+        matches = [c for c in _serializers.values() if c.__name__ == name]
+
+    if not matches:
+        raise LookupError("No serializer named {}.".format(name))
+    if len(matches) > 1:
+        raise LookupError("The serializer name {} is ambiguous.  Got {}.".format(
+            name, sorted(_key(c) for c in matches)))
+    return matches[0]
+
+
+def warm_up(serializer_classes=None):
+    """
+    Prepares the given serializer classes, or every registered one, so that no per-class work is left for the first
+    load or dump: field references are resolved and lookup tables and plans are built.  Returns the prepared classes.
+    """
+    if serializer_classes is None:
+        serializer_classes = registered_serializers()
+    for serializer_class in serializer_classes:
+        serializer_class.prepare()
+    return list(serializer_classes)
@@ -0,0 +1,89 @@
+"""
+Sampled validation for high volume feeds that are almost always valid.
+"""
+import random
+import threading
+
+__all__ = ("Sampler",)
+
+
+class Sampler(object):
+    """
+    Decides which records or list items are fully validated.  The rest are only converted, using the fields' trusted
+    loaders, and are fully validated only if their conversion fails.
+
+    Set an instance as 'sampler' on a serializer's Meta to sample its records, or pass one as the 'sampler' argument
+    of a ListField to sample its items.  A sampler may be shared by several serializers and fields.
+
+    :param rate: the fraction of items to validate, chosen at random.
+    :param every: validate every Nth item, starting with the first.  Exactly one of rate and every must be given.
+    :param threshold: once at least min_samples items have been sampled, every item is validated from then on if the
+                      fraction of sampled items that were invalid reaches this threshold.
+    :param min_samples: the number of sampled items needed before escalating.
+    :param seed: seed for the random choice of items, for reproducible sampling.
+    """
+    def __init__(self, rate=None, every=None, threshold=0.05, min_samples=100, seed=None):
+        if (rate is None) == (every is None):
+            raise ValueError("Exactly one of 'rate' and 'every' must be given.")
+        if every is not None and every < 1:
+            raise ValueError("'every' must be at least 1.  Got {}.".format(every))
+        self.rate = rate
+        self.every = every
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the counters and returns to sampling if the sampler had escalated.
+        """
+        self.seen = 0
+        self.sampled = 0
+        self.sampled_errors = 0
+        self.detected_errors = 0
+        self.escalated = False
+
+    def sample(self):
+        """
+        Returns True if the next item should be fully validated.
+        """
+        with self._lock:
+            self.seen += 1
+            if self.escalated:
+                chosen = True
+            elif self.every is not None:
+                chosen = (self.seen - 1) % self.every == 0
+            else:
+                chosen = self._random.random() < self.rate
+            if chosen:
+                self.sampled += 1
+            return chosen
+
+    def record(self, sampled_errors=0, detected_errors=0):
+        """
+        Records the number of sampled items that were invalid, and of items that were not sampled but failed to
+        convert.  Only sampled errors count towards escalation.
+        """
+        with self._lock:
+            self.sampled_errors += sampled_errors
+            self.detected_errors += detected_errors
+            if not self.escalated and self.sampled >= self.min_samples and \
+                    self.sampled_errors >= self.threshold * self.sampled:
+                self.escalated = True
+
+    def error_rate(self):
+        if not self.sampled:
+            return 0.0
+        return float(self.sampled_errors) / self.sampled
+
+    def stats(self):
+        return {
+            "seen": self.seen,
+            "sampled": self.sampled,
+            "sampled_errors": self.sampled_errors,
+            "detected_errors": self.detected_errors,
+            "error_rate": self.error_rate(),
+            "escalated": self.escalated,
+        }
@@ -1,10 +1,138 @@
+import re
+
 from .base import ValidationError
 
+__all__ = ("Validator", "EnumValidator", "RangeValidator", "LengthValidator", "RegexValidator", "PredicateValidator")
+
+
+class Validator(object):
+    """
+    Base class for validators.
+
+    Subclasses implement 'is_valid' and 'message', and get 'validate' and 'validate_many' for free.  Anything done in
+    the constructor (building sets, compiling patterns) happens once, when the serializer class is built.
+    """
+    def is_valid(self, data):
+        raise NotImplementedError()
+
+    def message(self, field, data):
+        raise NotImplementedError()
+
+    def validate(self, field, data):
+        if not self.is_valid(data):
+            raise ValidationError(self.message(field, data))
+
+    def validate_many(self, field, values):
+        """
+        Validates a sequence of values at once and returns a list of (index, message) pairs for the invalid ones.
+        Messages are only formatted for invalid values.
+        """
+        is_valid = self.is_valid
+        return [(i, self.message(field, value)) for i, value in enumerate(values) if not is_valid(value)]
+
 
-class EnumValidator(object):
+class EnumValidator(Validator):
     def __init__(self, *choices):
         self.choices = choices
+        try:
+            self.choice_set = frozenset(choices)
+        except TypeError:
+            self.choice_set = None
 
-    def validate(self, field, data):
-        if data not in self.choices:
-            raise ValidationError("{} must be one of {}.  Got {}.".format(field.name, self.choices, data))
+    def is_valid(self, data):
+        if self.choice_set is not None:
+            try:
+                return data in self.choice_set
+            except TypeError:
+                pass
+        return data in self.choices
+
+    def message(self, field, data):
+        return "{} must be one of {}.  Got {}.".format(field.name, self.choices, data)
+
+
+class RangeValidator(Validator):
+    """
+    Checks that the data is between min_value and max_value, inclusive.  Either bound may be None.
+    """
+    def __init__(self, min_value=None, max_value=None):
+        self.min_value = min_value
+        self.max_value = max_value
+
+    def is_valid(self, data):
+        try:
+            return ((self.min_value is None or data >= self.min_value) and
+                    (self.max_value is None or data <= self.max_value))
+        except TypeError:
+            return False
+
+    def message(self, field, data):
+        if self.min_value is not None and self.max_value is not None:
+            return "{} must be between {} and {}.  Got {}.".format(field.name, self.min_value, self.max_value, data)
+        if self.min_value is not None:
+            return "{} must be at least {}.  Got {}.".format(field.name, self.min_value, data)
+        return "{} must be at most {}.  Got {}.".format(field.name, self.max_value, data)
+
+
+class LengthValidator(Validator):
+    """
+    Checks that the length of the data is between min_length and max_length, inclusive.  Either bound may be None.
+    """
+    def __init__(self, min_length=None, max_length=None):
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def is_valid(self, data):
+        try:
+            length = len(data)
+        except TypeError:
+            return False
+        return ((self.min_length is None or length >= self.min_length) and
+                (self.max_length is None or length <= self.max_length))
+
+    def message(self, field, data):
+        try:
+            length = len(data)
+        except TypeError:
+            return "{} must have a length.  Got {}.".format(field.name, type(data))
+        if self.min_length is not None and self.max_length is not None:
+            return "{} must have a length between {} and {}.  Got {}.".format(field.name, self.min_length,
+                                                                              self.max_length, length)
+        if self.min_length is not None:
+            return "{} must have a length of at least {}.  Got {}.".format(field.name, self.min_length, length)
+        return "{} must have a length of at most {}.  Got {}.".format(field.name, self.max_length, length)
+
+
+class RegexValidator(Validator):
+    """
+    Checks that the data contains a match for pattern, which is compiled once.  Anchor the pattern with ^ and $ to
+    match the whole value.
+    """
+    def __init__(self, pattern, flags=0):
+        self.regex = re.compile(pattern, flags)
+
+    def is_valid(self, data):
+        try:
+            return self.regex.search(data) is not None
+        except TypeError:
+            return False
+
+    def message(self, field, data):
+        return "{} must match {}.  Got {}.".format(field.name, self.regex.pattern, data)
+
+
+class PredicateValidator(Validator):
+    """
+    Checks that predicate(data) is true.
+
+    :param message: format string for the error, given the field name and the data.
+    """
+    def __init__(self, predicate, message="{} is invalid.  Got {}."):
+        self.predicate = predicate
+        self.message_format = message
+
+    def is_valid(self, data):
+        return bool(self.predicate(data))
+
+    def message(self, field, data):
+        return self.message_format.format(field.name, data)
@@ -42,9 +42,14 @@ setup(
     version=__version__,
     description=__doc__,
     keywords="dto serializer serialize REST marshal JSON",
-    packages=find_packages(exclude=["test/"]),
+    packages=find_packages(exclude=["test/", "benchmarks"]),
     cmdclass={
         "docs": DocsCommand,
     },
+    entry_points={
+        "console_scripts": [
+            "r2dto = r2dto.__main__:main",
+        ],
+    },
     classifiers=CLASSIFIERS,
 )
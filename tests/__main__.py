@@ -5,8 +5,23 @@ import unittest
 import r2dto
 from tests.test_acceptance import AcceptanceTests
 from tests.test_base_serializer import BaseSerializerTests
+from tests.test_cache import DumpMemoTests, DumpCacheTests, LoadCacheTests
+from tests.test_binary import BinaryCodecTests
+from tests.test_columnar import LoadColumnsTests
+from tests.test_ndjson import LoadNdjsonTests
+from tests.test_main import MainTests
+from tests.test_benchmarks import BenchmarkTests
+from tests.test_instrumentation import InstrumentationTests
+from tests.test_memory import MemoryBudgetTests
+from tests.test_validators import ValidatorTests
+from tests.test_sampling import SamplerTests
+from tests.test_registry import RegistryTests
+from tests.test_batch import BatchTests, ConcurrencyStressTests
 
-__all__ = ["doctest", "sys", "unittest", "r2dto", "AcceptanceTests", "BaseSerializerTests"]
+__all__ = ["doctest", "sys", "unittest", "r2dto", "AcceptanceTests", "BaseSerializerTests", "DumpMemoTests",
+           "DumpCacheTests", "LoadCacheTests", "BinaryCodecTests", "LoadColumnsTests", "LoadNdjsonTests", "MainTests",
+           "BenchmarkTests", "InstrumentationTests", "MemoryBudgetTests", "ValidatorTests",
+           "SamplerTests", "RegistryTests", "BatchTests", "ConcurrencyStressTests"]
 
 try:
     import pep8
@@ -17,13 +32,39 @@ except ImportError:
 
 PEP8_SOURCES = [
     "r2dto/__init__.py",
+    "r2dto/__main__.py",
     "r2dto/base.py",
+    "r2dto/batch.py",
+    "r2dto/binary.py",
+    "r2dto/cache.py",
+    "r2dto/columnar.py",
     "r2dto/fields.py",
+    "r2dto/instrumentation.py",
+    "r2dto/ndjson.py",
+    "r2dto/registry.py",
+    "r2dto/sampling.py",
     "r2dto/validators.py",
+    "benchmarks/__init__.py",
+    "benchmarks/__main__.py",
+    "benchmarks/data.py",
+    "benchmarks/memory.py",
+    "benchmarks/suite.py",
     "tests/__init__.py",
     "tests/__main__.py",
     "tests/test_acceptance.py",
     "tests/test_base_serializer.py",
+    "tests/test_batch.py",
+    "tests/test_benchmarks.py",
+    "tests/test_binary.py",
+    "tests/test_cache.py",
+    "tests/test_columnar.py",
+    "tests/test_instrumentation.py",
+    "tests/test_main.py",
+    "tests/test_memory.py",
+    "tests/test_ndjson.py",
+    "tests/test_registry.py",
+    "tests/test_sampling.py",
+    "tests/test_validators.py",
 ]
 
 if __name__ == "__main__":
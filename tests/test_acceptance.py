@@ -6,8 +6,8 @@ import uuid
 
 import pytz
 
-from r2dto.fields import StringField, BooleanField, FloatField, IntegerField, ListField, ObjectField, \
-    InternetDateTimeField, DateTimeField, UuidField, DateField, TimeField, \
+from r2dto.fields import StringField, BooleanField, FloatField, IntegerField, ListField, ObjectField, UnionField, \
+    DictField, InternetDateTimeField, DateTimeField, UuidField, DateField, TimeField, \
     _default_parse_internet_datetime_string_function
 from r2dto import Serializer, ValidationError
 
@@ -462,3 +462,133 @@ class AcceptanceTests(unittest.TestCase):
             est = pytz.timezone(random.choice(list(pytz.all_timezones)))
             dt = est.localize(dt)
             self.assertEqual(field.object_to_data(dt), dt.isoformat())
+
+    def test_union_field(self):
+        class Circle(object):
+            def __init__(self, radius=0.0):
+                self.radius = radius
+
+        class Square(object):
+            def __init__(self, side=0):
+                self.side = side
+
+        class UnitSquare(Square):
+            pass
+
+        class CircleSerializer(Serializer):
+            class Meta:
+                model = Circle
+
+            radius = FloatField(required=True)
+
+        class SquareSerializer(Serializer):
+            class Meta:
+                model = Square
+
+            side = IntegerField(required=True)
+
+        class DrawingSerializer(Serializer):
+            shape = UnionField({"circle": CircleSerializer, "square": SquareSerializer}, required=True)
+            shapes = ListField(UnionField({"circle": CircleSerializer, "square": SquareSerializer}))
+
+        data = {
+            "shape": {"type": "circle", "radius": 2.5},
+            "shapes": [{"type": "square", "side": 3}, {"type": "circle", "radius": 1.0}],
+        }
+        s = DrawingSerializer(data=data)
+        s.validate()
+        self.assertIsInstance(s.object.shape, Circle)
+        self.assertEqual(2.5, s.object.shape.radius)
+        self.assertIsInstance(s.object.shapes[0], Square)
+        self.assertEqual(3, s.object.shapes[0].side)
+        self.assertIsInstance(s.object.shapes[1], Circle)
+
+        s.object.shapes.append(UnitSquare(1))
+        s2 = DrawingSerializer(object=s.object)
+        s2.validate()
+        self.assertEqual(data["shape"], s2.data["shape"])
+        self.assertEqual(data["shapes"], s2.data["shapes"][:2])
+        self.assertEqual({"type": "square", "side": 1}, s2.data["shapes"][2])
+
+        for bad_shape in ({"type": "triangle"}, {"radius": 1.0}, {"type": ["circle"]}, "circle"):
+            s = DrawingSerializer(data={"shape": bad_shape})
+            self.assertRaises(ValidationError, s.validate)
+
+        s = DrawingSerializer(data={"shape": {"type": "circle", "radius": "big"}})
+        self.assertRaises(ValidationError, s.validate)
+
+        o = type("Drawing", (object,), {})()
+        o.shape = object()
+        o.shapes = []
+        self.assertRaises(ValidationError, DrawingSerializer(object=o).validate)
+
+    def test_union_field_without_models(self):
+        class CircleSerializer(Serializer):
+            radius = FloatField()
+
+        class LabelSerializer(Serializer):
+            text = StringField()
+
+        class DrawingSerializer(Serializer):
+            shape = UnionField({"circle": CircleSerializer, "label": LabelSerializer}, discriminator="kind")
+
+        for data in ({"shape": {"kind": "circle", "radius": 2.5}}, {"shape": {"kind": "label", "text": "a"}}):
+            for view in (False, True):
+                s = DrawingSerializer(data=data, view=view)
+                s.validate()
+                self.assertEqual(data["shape"]["kind"], s.object.shape.kind)
+
+                s = DrawingSerializer(object=s.object)
+                s.validate()
+                self.assertEqual(data, s.data)
+
+    def test_dict_field(self):
+        class ObjSerializer(Serializer):
+            counts = DictField(StringField(), IntegerField(), name="counts", max_size=3)
+            created = DictField(StringField(), DateTimeField(), allow_null=False)
+
+        data = {
+            "counts": {"a": 1, "b": 2},
+            "created": {"a": "2013-12-30 23:56:23.431090"},
+        }
+        s = ObjSerializer(data=data)
+        s.validate()
+        self.assertEqual(data["counts"], s.object.counts)
+        self.assertIsNot(data["counts"], s.object.counts)
+        self.assertEqual({"a": datetime(2013, 12, 30, 23, 56, 23, 431090)}, s.object.created)
+
+        s2 = ObjSerializer(object=s.object)
+        s2.validate()
+        self.assertEqual(data, s2.data)
+
+        s = ObjSerializer(data={"counts": {"a": 1, "c": None}})
+        s.validate()
+        self.assertEqual({"a": 1, "c": None}, s.object.counts)
+
+    def test_dict_field_failure(self):
+        class ObjSerializer(Serializer):
+            counts = DictField(StringField(), IntegerField(allow_null=False), max_size=2)
+
+        s = ObjSerializer(data={"counts": {"a": 1, "b": "two"}})
+        try:
+            s.validate()
+            self.fail("No Exception was thrown, object should have failed validation")
+        except ValidationError as ex:
+            self.assertEqual(1, len(ex.errors))
+            self.assertTrue(ex.errors[0].startswith("counts[b]: "))
+
+        s = ObjSerializer(data={"counts": {"a": None}})
+        self.assertRaises(ValidationError, s.validate)
+
+        s = ObjSerializer(data={"counts": {1: 1}})
+        self.assertRaises(ValidationError, s.validate)
+
+        s = ObjSerializer(data={"counts": {"a": 1, "b": 2, "c": 3}})
+        try:
+            s.validate()
+            self.fail("No Exception was thrown, object should have failed validation")
+        except ValidationError as ex:
+            self.assertEqual(["counts must have at most 2 entries.  Got 3."], ex.errors)
+
+        s = ObjSerializer(data={"counts": [("a", 1)]})
+        self.assertRaises(ValidationError, s.validate)
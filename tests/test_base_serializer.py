@@ -1,7 +1,13 @@
+import copy
+import datetime
+import pickle
 import unittest
+import uuid
 
-from r2dto.fields import StringField
-from r2dto import Serializer
+from r2dto import base
+from r2dto.base import DataView
+from r2dto.fields import StringField, IntegerField, ObjectField, ListField, UnionField, DateTimeField, UuidField
+from r2dto import Serializer, ValidationError
 
 
 class BaseSerializerTests(unittest.TestCase):
@@ -80,3 +86,254 @@ class BaseSerializerTests(unittest.TestCase):
         s = ObjSerializer(object=o)
         s.validate()
         self.assertEqual(s.data["stringField"], o.string_field)
+
+    def test_fields_keep_declaration_order(self):
+        class ObjSerializer(Serializer):
+            zeta = StringField()
+            alpha = StringField()
+            mu = StringField()
+
+        self.assertEqual(["zeta", "alpha", "mu"], [field.name for field in ObjSerializer.fields])
+
+    def test_compact(self):
+        class Point(object):
+            def __init__(self, x=0, y=0):
+                self.x = x
+                self.y = y
+
+        class Label(object):
+            def __init__(self, text=""):
+                self.text = text
+
+        class PointSerializer(Serializer):
+            class Meta:
+                model = Point
+
+            x = IntegerField(required=True)
+            y = IntegerField()
+
+        class LabelSerializer(Serializer):
+            class Meta:
+                model = Label
+
+            text = StringField()
+
+        class PathSerializer(Serializer):
+            name = StringField(required=True)
+            start = ObjectField(PointSerializer)
+            points = ListField(ObjectField(PointSerializer))
+            marker = UnionField({"point": PointSerializer, "label": LabelSerializer})
+
+        self.assertEqual(["name", ["start", ["x", "y"]], ["points", [["x", "y"]]],
+                          ["marker", {"point": ["x", "y"], "label": ["text"]}]],
+                         PathSerializer.compact_schema())
+
+        path = type("Path", (object,), {})()
+        path.name = "route"
+        path.start = Point(1, 2)
+        path.points = [Point(3, 4), Point(5, 6)]
+        path.marker = Label("here")
+
+        s = PathSerializer(object=path, compact=True)
+        s.validate()
+        self.assertEqual(["route", [1, 2], [[3, 4], [5, 6]], ["label", ["here"]]], s.data)
+
+        s = PathSerializer(data=s.data, compact=True)
+        s.validate()
+        self.assertEqual("route", s.object.name)
+        self.assertEqual(2, s.object.start.y)
+        self.assertEqual(5, s.object.points[1].x)
+        self.assertEqual("here", s.object.marker.text)
+
+        s = PathSerializer(data=["route", [1]], compact=True)
+        s.validate()
+        self.assertEqual(1, s.object.start.x)
+        self.assertFalse(hasattr(s.object, "points"))
+
+        for bad in ([], ["route", [1, 2], [], None, "extra"], ["route", ["x"]], {"name": "route"}):
+            self.assertRaises(ValidationError, PathSerializer(data=bad, compact=True).validate)
+
+    def test_dump_and_load_compact(self):
+        class ObjSerializer(Serializer):
+            name = StringField()
+            count = IntegerField()
+
+        objects = []
+        for i in range(3):
+            o = type("Obj", (object,), {})()
+            o.name = "obj{}".format(i)
+            o.count = i
+            objects.append(o)
+
+        payload = ObjSerializer.dump_compact(objects)
+        self.assertEqual({"schema": ["name", "count"], "records": [["obj0", 0], ["obj1", 1], ["obj2", 2]]}, payload)
+
+        loaded = ObjSerializer.load_compact(payload)
+        self.assertEqual([0, 1, 2], [o.count for o in loaded])
+
+        self.assertRaises(ValidationError, ObjSerializer.load_compact, {"schema": ["count"], "records": []})
+        try:
+            ObjSerializer.load_compact({"schema": ["name", "count"], "records": [["a", 1], ["b", "two"]]})
+            self.fail("No Exception was thrown, object should have failed validation")
+        except ValidationError as ex:
+            self.assertEqual(1, len(ex.errors))
+            self.assertTrue(ex.errors[0].startswith("[1]: "))
+
+    def test_trusted(self):
+        class Obj(object):
+            pass
+
+        class ChildSerializer(Serializer):
+            when = DateTimeField()
+
+        class ObjSerializer(Serializer):
+            name = StringField()
+            id = UuidField()
+            counts = ListField(IntegerField())
+            whens = ListField(DateTimeField())
+            child = ObjectField(ChildSerializer)
+
+        o = Obj()
+        o.name = "hi"
+        o.id = uuid.UUID("46b4e146-21a7-435e-a0d3-f7d6ce773085")
+        o.counts = [1, 2]
+        o.whens = [datetime.datetime(2013, 12, 30, 23, 56, 23)]
+        o.child = Obj()
+        o.child.when = None
+
+        expected = {
+            "name": "hi",
+            "id": "46b4e146-21a7-435e-a0d3-f7d6ce773085",
+            "counts": [1, 2],
+            "whens": ["2013-12-30 23:56:23.000000"],
+            "child": {"when": None},
+        }
+        s = ObjSerializer(object=o, trusted=True)
+        s.validate()
+        self.assertEqual(expected, s.data)
+        self.assertIsNot(o.counts, s.data["counts"])
+
+        s = ObjSerializer(object=o, trusted=True, compact=True)
+        s.validate()
+        self.assertEqual(["hi", "46b4e146-21a7-435e-a0d3-f7d6ce773085", [1, 2], ["2013-12-30 23:56:23.000000"],
+                          [None]], s.data)
+
+        # Type checks are skipped when trusted, so bad values go through unchanged.
+        o.name = 1
+        s = ObjSerializer(object=o, trusted=True)
+        s.validate()
+        self.assertEqual(1, s.data["name"])
+        self.assertRaises(ValidationError, ObjSerializer(object=o).validate)
+
+    def test_trusted_meta_and_check_switch(self):
+        class Obj(object):
+            pass
+
+        class ObjSerializer(Serializer):
+            class Meta(object):
+                trusted = True
+            name = StringField()
+
+        o = Obj()
+        o.name = 1
+        self.assertTrue(ObjSerializer(object=o).trusted)
+        self.assertFalse(ObjSerializer(object=o, trusted=False).trusted)
+        self.assertEqual((("name", "name", None),), ObjSerializer.trusted_plan())
+
+        base.CHECK_TRUSTED = True
+        try:
+            self.assertRaises(ValidationError, ObjSerializer(object=o).validate)
+        finally:
+            base.CHECK_TRUSTED = False
+
+    def test_trusted_keeps_overridden_conversions(self):
+        class Obj(object):
+            pass
+
+        class UpperField(StringField):
+            def object_to_data(self, obj):
+                return obj.upper()
+
+        class ObjSerializer(Serializer):
+            name = UpperField()
+            names = ListField(UpperField())
+
+        o = Obj()
+        o.name = "a"
+        o.names = ["b"]
+        s = ObjSerializer(object=o, trusted=True)
+        s.validate()
+        self.assertEqual({"name": "A", "names": ["B"]}, s.data)
+
+    def test_view(self):
+        class ChildSerializer(Serializer):
+            count = IntegerField()
+
+        class ObjSerializer(Serializer):
+            class Meta(object):
+                view = True
+            name = StringField(name="fullName")
+            when = DateTimeField()
+            counts = ListField(IntegerField())
+            child = ObjectField(ChildSerializer)
+
+        data = {"fullName": "Homer", "when": "2013-12-30 23:56:23.431090", "counts": [1, 2],
+                "child": {"count": 3}, "extra": 1}
+        s = ObjSerializer(data=data)
+        s.validate()
+        obj = s.object
+        self.assertIsInstance(obj, DataView)
+        self.assertEqual("Homer", obj.name)
+        self.assertEqual(datetime.datetime(2013, 12, 30, 23, 56, 23, 431090), obj.when)
+        self.assertIs(data["counts"], obj.counts)
+        self.assertIsInstance(obj.child, DataView)
+        self.assertEqual(3, obj.child.count)
+        self.assertRaises(AttributeError, getattr, obj, "extra")
+        self.assertRaises(AttributeError, getattr, obj, "fullName")
+
+        obj.name = "Marge"
+        self.assertEqual("Marge", obj.name)
+        self.assertEqual("Homer", data["fullName"])
+
+        s = ObjSerializer(object=obj)
+        s.validate()
+        self.assertEqual({"fullName": "Marge", "when": "2013-12-30 23:56:23.431090", "counts": [1, 2],
+                          "child": {"count": 3}}, s.data)
+
+        for loaded in (copy.deepcopy(obj), pickle.loads(pickle.dumps(obj, 2))):
+            self.assertEqual("Marge", loaded.name)
+            self.assertEqual([1, 2], loaded.counts)
+
+        s = ObjSerializer(data={"fullName": "Bart"})
+        s.validate()
+        self.assertRaises(AttributeError, getattr, s.object, "counts")
+
+    def test_view_off(self):
+        class Obj(object):
+            pass
+
+        class ModelSerializer(Serializer):
+            class Meta(object):
+                view = True
+                model = Obj
+            counts = ListField(IntegerField())
+
+        class ObjSerializer(Serializer):
+            counts = ListField(IntegerField())
+
+        data = {"counts": [1, 2]}
+        s = ModelSerializer(data=data)
+        s.validate()
+        self.assertIsInstance(s.object, Obj)
+        self.assertIs(data["counts"], s.object.counts)
+
+        s = ObjSerializer(data=data)
+        s.validate()
+        self.assertNotIsInstance(s.object, DataView)
+        self.assertIsNot(data["counts"], s.object.counts)
+        self.assertEqual([1, 2], s.object.counts)
+
+        s = ObjSerializer(data=data, view=True)
+        s.validate()
+        self.assertIsInstance(s.object, DataView)
+        self.assertRaises(ValidationError, ObjSerializer(data={"counts": [1, "2"]}, view=True).validate)
@@ -0,0 +1,239 @@
+import datetime
+import sys
+import threading
+import unittest
+import uuid
+
+from r2dto import Serializer, ValidationError
+from r2dto.batch import load_many, dump_many, ThreadPoolExecutor
+from r2dto.fields import DateTimeField, IntegerField, ListField, ObjectField, StringField, UnionField, UuidField
+from r2dto.instrumentation import Instrumentation
+from r2dto.sampling import Sampler
+from r2dto.validators import RangeValidator
+
+THREADS = 8
+ROUNDS = 20
+
+
+class Cat(object):
+    pass
+
+
+class Kitten(Cat):
+    pass
+
+
+class Dog(object):
+    pass
+
+
+def make_serializers():
+    """
+    Returns new serializer classes, so that their plans and lookup tables are built by the threads under test.
+    """
+    class CatSerializer(Serializer):
+        class Meta(object):
+            model = Cat
+        name = StringField()
+        lives = IntegerField(validators=[RangeValidator(0, 9)])
+
+    class DogSerializer(Serializer):
+        class Meta(object):
+            model = Dog
+        name = StringField()
+
+    class OwnerSerializer(Serializer):
+        name = StringField(required=True)
+        id = UuidField()
+        born = DateTimeField()
+        scores = ListField(IntegerField(validators=[RangeValidator(0, 100)]))
+        pet = UnionField({"cat": CatSerializer, "dog": DogSerializer})
+        friend = ObjectField(CatSerializer)
+
+    return OwnerSerializer
+
+
+def make_record(i):
+    pet = {"type": "cat", "name": "cat{}".format(i), "lives": i % 10} if i % 2 else {"type": "dog", "name": "dog"}
+    return {
+        "name": "owner{}".format(i),
+        "id": str(uuid.UUID(int=i)),
+        "born": "2013-12-30 23:56:{:02d}.431090".format(i % 60),
+        "scores": [i % 100, (i * 7) % 100],
+        "pet": pet,
+        "friend": {"name": "friend{}".format(i), "lives": 1},
+    }
+
+
+def make_object(i):
+    owner = type("Owner", (object,), {})()
+    owner.name = "owner{}".format(i)
+    owner.id = uuid.UUID(int=i)
+    owner.born = datetime.datetime(2013, 12, 30, 23, 56, i % 60, 431090)
+    owner.scores = [i % 100, (i * 7) % 100]
+    # Kittens are only found through the MRO of their class, which updates the union's lookup table.
+    owner.pet = (Kitten if i % 3 else Cat)() if i % 2 else Dog()
+    owner.pet.name = "pet{}".format(i)
+    owner.pet.lives = i % 10
+    owner.friend = Cat()
+    owner.friend.name = "friend{}".format(i)
+    owner.friend.lives = 1
+    return owner
+
+
+def run_threads(target, count=THREADS):
+    """
+    Runs target(thread index) on count threads released at the same time, and returns the results in thread order.
+    """
+    start = threading.Event()
+    results = [None] * count
+    failures = []
+
+    def run(index):
+        start.wait()
+        try:
+            results[index] = target(index)
+        except Exception as ex:
+            failures.append(ex)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+    return results
+
+
+class BatchTests(unittest.TestCase):
+    def test_load_many(self):
+        serializer_class = make_serializers()
+        records = [make_record(i) for i in range(200)]
+        objects = load_many(serializer_class, records, workers=4, chunk_size=7)
+        self.assertEqual(["owner{}".format(i) for i in range(200)], [obj.name for obj in objects])
+        self.assertEqual(uuid.UUID(int=5), objects[5].id)
+        self.assertIsInstance(objects[5].pet, Cat)
+        self.assertEqual([], load_many(serializer_class, []))
+
+    def test_dump_many(self):
+        serializer_class = make_serializers()
+        objects = [make_object(i) for i in range(200)]
+        expected = []
+        for obj in objects:
+            s = serializer_class(object=obj)
+            s.validate()
+            expected.append(s.data)
+        self.assertEqual(expected, dump_many(serializer_class, objects, workers=4, chunk_size=5))
+        self.assertEqual(expected, dump_many(serializer_class, objects, workers=4, trusted=True))
+
+    def test_errors(self):
+        serializer_class = make_serializers()
+        records = [make_record(i) for i in range(20)]
+        del records[3]["name"]
+        records[15]["scores"] = [1000]
+        with self.assertRaises(ValidationError) as ctx:
+            load_many(serializer_class, records, workers=4, chunk_size=2)
+        errors = ctx.exception.errors
+        self.assertEqual(2, len(errors))
+        self.assertTrue(errors[0].startswith("[3]: "))
+        self.assertTrue(errors[1].startswith("[15]: "))
+
+    @unittest.skipIf(ThreadPoolExecutor is None, "concurrent.futures is not available")
+    def test_executor(self):
+        serializer_class = make_serializers()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            objects = load_many(serializer_class, [make_record(i) for i in range(10)], executor=executor, view=True)
+            self.assertEqual("owner9", objects[9].name)
+            # The executor is left running.
+            self.assertEqual(1, executor.submit(len, [0]).result())
+
+
+class ConcurrencyStressTests(unittest.TestCase):
+    def setUp(self):
+        # Switching threads as often as possible makes races far more likely to show up.
+        self.switch_interval = None
+        if hasattr(sys, "setswitchinterval"):
+            self.switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        if self.switch_interval is not None:
+            sys.setswitchinterval(self.switch_interval)
+
+    def test_concurrent_loads(self):
+        records = [make_record(i) for i in range(50)]
+        for _ in range(ROUNDS):
+            serializer_class = make_serializers()
+
+            def load(index):
+                names = []
+                for record in records:
+                    s = serializer_class(data=record)
+                    s.validate()
+                    names.append((s.object.name, s.object.born.second, s.object.pet.name))
+                return names
+
+            results = run_threads(load)
+            expected = [("owner{}".format(i), i % 60, records[i]["pet"]["name"]) for i in range(50)]
+            for result in results:
+                self.assertEqual(expected, result)
+
+    def test_concurrent_dumps(self):
+        objects = [make_object(i) for i in range(50)]
+        for trusted in (False, True):
+            for _ in range(ROUNDS):
+                serializer_class = make_serializers()
+
+                def dump(index):
+                    res = []
+                    for obj in objects:
+                        s = serializer_class(object=obj, trusted=trusted)
+                        s.validate()
+                        res.append(s.data)
+                    return res
+
+                results = run_threads(dump)
+                for result in results[1:]:
+                    self.assertEqual(results[0], result)
+                self.assertEqual(["cat", "cat", "cat"], [data["pet"]["type"] for data in results[0][1:7:2]])
+
+    def test_concurrent_forward_references(self):
+        for round_i in range(ROUNDS):
+            name = "StressTargetSerializer{}".format(round_i)
+
+            class StressSerializer(Serializer):
+                child = ObjectField(name)
+                children = ListField(ObjectField(name))
+
+            # Kept referenced, as the registry only holds serializers weakly.
+            target = type(name, (Serializer,), {"value": IntegerField()})
+
+            def load(index):
+                s = StressSerializer(data={"child": {"value": index}, "children": [{"value": 1}] * 3})
+                s.validate()
+                return s.object.child.value
+
+            self.assertEqual(list(range(THREADS)), run_threads(load))
+            self.assertIs(target, StressSerializer.fields[0].serializer_class)
+
+    def test_concurrent_counters(self):
+        instrumentation = Instrumentation()
+        sampler = Sampler(every=2, min_samples=10 ** 6)
+
+        class CountedSerializer(Serializer):
+            class Meta(object):
+                pass
+            Meta.instrumentation = instrumentation
+            Meta.sampler = sampler
+            value = IntegerField()
+
+        def load(index):
+            for i in range(100):
+                CountedSerializer(data={"value": i}).validate()
+
+        run_threads(load)
+        self.assertEqual(THREADS * 100, sampler.seen)
+        self.assertEqual(THREADS * 50, sampler.sampled)
+        self.assertEqual(THREADS * 100, instrumentation.as_dict()["load"]["CountedSerializer"]["calls"])
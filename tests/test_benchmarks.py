@@ -0,0 +1,34 @@
+import unittest
+
+from benchmarks import data
+from benchmarks.suite import compare, run_case
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_cases_round_trip(self):
+        cases = [data.field_case(name, 5) for name in sorted(data.FIELD_CASES)]
+        cases += [data.nested_case(10, 2), data.list_case(10), data.wide_case(100, 2)]
+        for serializer_class, records in cases:
+            res = run_case(serializer_class, records, repeat=1)
+            self.assertEqual(len(records), res["records"])
+            self.assertGreater(res["load_per_sec"], 0)
+            self.assertGreater(res["dump_per_sec"], 0)
+
+    def test_data_is_deterministic(self):
+        self.assertEqual(data.wide_case(100, 3)[1], data.wide_case(100, 3)[1])
+        self.assertEqual(100, len(data.wide_case(100, 1)[0].fields))
+
+    def test_compare(self):
+        baseline = {"results": {
+            "a": {"records": 10, "load_per_sec": 100.0, "dump_per_sec": 100.0, "load_alloc_bytes_per_record": 50.0},
+            "b": {"records": 10, "load_per_sec": 100.0},
+        }}
+        current = {"results": {
+            "a": {"records": 20, "load_per_sec": 85.0, "dump_per_sec": 95.0, "load_alloc_bytes_per_record": 60.0},
+            "c": {"records": 10, "load_per_sec": 1.0},
+        }}
+        regressions = compare(baseline, current, threshold=0.1)
+        self.assertEqual(2, len(regressions))
+        self.assertTrue(regressions[0].startswith("a load_alloc_bytes_per_record"))
+        self.assertTrue(regressions[1].startswith("a load_per_sec"))
+        self.assertEqual([], compare(baseline, current, threshold=0.25))
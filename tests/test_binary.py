@@ -0,0 +1,207 @@
+from datetime import datetime, date, time
+import unittest
+import uuid
+
+import pytz
+
+from r2dto.binary import BinaryCodec
+from r2dto.fields import StringField, BooleanField, FloatField, IntegerField, ListField, ObjectField, UnionField, \
+    DictField, InternetDateTimeField, DateTimeField, UuidField, DateField, TimeField, Field
+from r2dto.validators import EnumValidator
+from r2dto import Serializer, ValidationError
+
+
+class Address(object):
+    def __init__(self, street="", number=0):
+        self.street = street
+        self.number = number
+
+
+class Person(object):
+    pass
+
+
+class AddressSerializer(Serializer):
+    class Meta:
+        model = Address
+
+    street = StringField(required=True)
+    number = IntegerField()
+
+
+class PersonSerializer(Serializer):
+    class Meta:
+        model = Person
+
+    name = StringField(required=True, allow_null=False)
+    age = IntegerField()
+    height = FloatField()
+    active = BooleanField()
+    born = InternetDateTimeField()
+    updated = DateTimeField()
+    day = DateField()
+    alarm = TimeField()
+    id = UuidField()
+    home = ObjectField(AddressSerializer)
+    previous = ListField(ObjectField(AddressSerializer))
+    tags = ListField([IntegerField(), StringField()])
+    scores = DictField(StringField(), FloatField())
+    extra = Field()
+
+
+def make_person():
+    p = Person()
+    p.name = u"Homer \u2134" * 10
+    p.age = -39
+    p.height = 1.83
+    p.active = True
+    p.born = datetime(1956, 5, 12, 1, 2, 3, 456789)
+    p.updated = datetime(2020, 2, 29, 23, 59, 59, 999999)
+    p.day = date(1989, 12, 17)
+    p.alarm = time(6, 30, 0, 15)
+    p.id = uuid.UUID("e841beb3-ff2e-4b0a-b6a6-ea56044b2288")
+    p.home = Address("Evergreen Terrace", 742)
+    p.previous = [Address("Main", 1), Address("Second", 2 ** 40)]
+    p.tags = [1, "two", 10 ** 30]
+    p.scores = {"bowling": 0.5}
+    p.extra = {"nested": [1, None, "x"]}
+    return p
+
+
+class BinaryCodecTests(unittest.TestCase):
+    def assert_round_trip(self, p, res):
+        for attr in ("name", "age", "height", "active", "born", "updated", "day", "alarm", "id", "tags", "scores",
+                     "extra"):
+            self.assertEqual(getattr(p, attr), getattr(res, attr))
+        self.assertIsInstance(res, Person)
+        self.assertIsInstance(res.home, Address)
+        self.assertEqual((p.home.street, p.home.number), (res.home.street, res.home.number))
+        self.assertEqual([a.number for a in p.previous], [a.number for a in res.previous])
+
+    def test_round_trip(self):
+        codec = BinaryCodec(PersonSerializer)
+        p = make_person()
+        encoded = codec.encode(p)
+        self.assertIsInstance(encoded, bytearray)
+        self.assert_round_trip(p, codec.decode(encoded))
+        self.assert_round_trip(p, codec.decode(memoryview(bytes(encoded))))
+
+    def test_encode_many_appends(self):
+        codec = BinaryCodec(PersonSerializer)
+        out = bytearray(b"header")
+        codec.encode_many([make_person(), make_person()], out)
+        self.assertTrue(out.startswith(b"header"))
+
+        people = codec.decode_many(memoryview(out)[len(b"header"):])
+        self.assertEqual(2, len(people))
+        self.assert_round_trip(make_person(), people[1])
+
+    def test_compact_representations(self):
+        class ObjSerializer(Serializer):
+            id = UuidField()
+            when = InternetDateTimeField()
+
+        o = Person()
+        o.id = uuid.uuid4()
+        o.when = datetime(1970, 1, 1, 0, 0, 1)
+        encoded = BinaryCodec(ObjSerializer).encode(o)
+        # array header, 18 bytes for the UUID and 9 for the 64 bit timestamp.
+        self.assertEqual(1 + 18 + 9, len(encoded))
+
+    def test_aware_datetimes_are_stored_as_utc(self):
+        class ObjSerializer(Serializer):
+            when = InternetDateTimeField()
+
+        o = Person()
+        o.when = pytz.timezone("US/Eastern").localize(datetime(2015, 6, 1, 12, 0))
+        res = BinaryCodec(ObjSerializer).decode(BinaryCodec(ObjSerializer).encode(o))
+        self.assertEqual(datetime(2015, 6, 1, 16, 0), res.when)
+
+    def test_union(self):
+        class ShapeSerializer(Serializer):
+            shape = UnionField({"address": AddressSerializer, "person": PersonSerializer})
+
+        o = Person()
+        o.shape = Address("Spalding Way", 1)
+        codec = BinaryCodec(ShapeSerializer)
+        res = codec.decode(codec.encode(o))
+        self.assertIsInstance(res.shape, Address)
+        self.assertEqual("Spalding Way", res.shape.street)
+
+    def test_union_without_models(self):
+        class NoteSerializer(Serializer):
+            text = StringField()
+
+        class ShapeSerializer(Serializer):
+            shape = UnionField({"address": AddressSerializer, "note": NoteSerializer})
+
+        o = Person()
+        o.shape = Person()
+        o.shape.type = "note"
+        o.shape.text = "hi"
+        codec = BinaryCodec(ShapeSerializer)
+        encoded = codec.encode(o)
+        res = codec.decode(encoded)
+        self.assertEqual(("note", "hi"), (res.shape.type, res.shape.text))
+        self.assertEqual(encoded, codec.encode(res))
+
+    def test_encode_errors(self):
+        codec = BinaryCodec(PersonSerializer)
+        p = make_person()
+        p.age = "old"
+        self.assertRaises(ValidationError, codec.encode, p)
+
+        p = make_person()
+        p.name = None
+        self.assertRaises(ValidationError, codec.encode, p)
+
+        p = make_person()
+        del p.name
+        self.assertRaises(ValidationError, codec.encode, p)
+
+        p = make_person()
+        p.tags = [1.5]
+        self.assertRaises(ValidationError, codec.encode, p)
+
+    def test_decode_errors(self):
+        class ObjSerializer(Serializer):
+            grade = StringField(validators=[EnumValidator("A", "B")])
+
+        class UncheckedSerializer(Serializer):
+            grade = StringField()
+
+        class OtherSerializer(Serializer):
+            grade = IntegerField()
+
+        o = Person()
+        o.grade = "C"
+        codec = BinaryCodec(ObjSerializer)
+        self.assertRaises(ValidationError, codec.decode, BinaryCodec(UncheckedSerializer).encode(o))
+
+        o.grade = 1
+        encoded = BinaryCodec(OtherSerializer).encode(o)
+        self.assertRaises(ValidationError, codec.decode, encoded)
+
+        o.grade = "A"
+        encoded = codec.encode(o)
+        self.assertEqual("A", codec.decode(encoded).grade)
+        self.assertRaises(ValidationError, codec.decode, encoded[:-1])
+        self.assertRaises(ValidationError, codec.decode, encoded + b"\x00")
+        self.assertRaises(ValidationError, BinaryCodec(PersonSerializer).decode, encoded)
+
+    def test_decode_malformed(self):
+        class PairSerializer(Serializer):
+            first = StringField()
+            second = StringField()
+
+        class AnySerializer(Serializer):
+            value = Field()
+
+        codec = BinaryCodec(PairSerializer)
+        # A string that is not valid UTF-8.
+        self.assertRaises(ValidationError, codec.decode, b"\x92\xc0\xa2\xff\xfe")
+        self.assertRaises(ValidationError, codec.decode_many, b"\x91\x92\xc0\xa2\xff\xfe")
+        # A map whose key is a list.
+        codec = BinaryCodec(AnySerializer)
+        self.assertRaises(ValidationError, codec.decode, b"\x91\x81\x90\x00")
+        self.assertRaises(ValidationError, codec.decode_from, b"\x91\x81\x90\x00")
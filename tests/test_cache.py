@@ -0,0 +1,234 @@
+import gc
+import unittest
+
+from r2dto.cache import DumpCache, LoadCache
+from r2dto.fields import StringField, IntegerField, ObjectField, ListField
+from r2dto import Serializer, ValidationError
+from r2dto.base import DataView
+
+
+class Author(object):
+    def __init__(self, name, version=1):
+        self.name = name
+        self.version = version
+
+
+class Post(object):
+    def __init__(self, title, author):
+        self.title = title
+        self.author = author
+
+
+class CountingStringField(StringField):
+    calls = 0
+
+    def object_to_data(self, obj):
+        CountingStringField.calls += 1
+        return super(CountingStringField, self).object_to_data(obj)
+
+
+class DumpMemoTests(unittest.TestCase):
+    def setUp(self):
+        CountingStringField.calls = 0
+
+        class AuthorSerializer(Serializer):
+            name = CountingStringField()
+
+        class PostSerializer(Serializer):
+            title = StringField()
+            author = ObjectField(AuthorSerializer)
+
+        class FeedSerializer(Serializer):
+            posts = ListField(ObjectField(PostSerializer))
+
+        self.feed_serializer = FeedSerializer
+
+    def test_memo_serializes_shared_objects_once(self):
+        author = Author("Homer")
+        feed = type("Feed", (object,), {})()
+        feed.posts = [Post("Post {}".format(i), author) for i in range(10)]
+
+        s = self.feed_serializer(object=feed, memo=True)
+        s.validate()
+
+        self.assertEqual(1, CountingStringField.calls)
+        self.assertEqual(10, len(s.data["posts"]))
+        self.assertIs(s.data["posts"][0]["author"], s.data["posts"][9]["author"])
+        self.assertEqual({"name": "Homer"}, s.data["posts"][5]["author"])
+
+    def test_memo_is_scoped_to_one_call(self):
+        author = Author("Homer")
+        feed = type("Feed", (object,), {})()
+        feed.posts = [Post("One", author), Post("Two", author)]
+
+        self.feed_serializer(object=feed, memo=True).validate()
+        self.feed_serializer(object=feed, memo=True).validate()
+        self.assertEqual(2, CountingStringField.calls)
+
+    def test_no_memo_by_default(self):
+        author = Author("Homer")
+        feed = type("Feed", (object,), {})()
+        feed.posts = [Post("One", author), Post("Two", author)]
+
+        s = self.feed_serializer(object=feed)
+        s.validate()
+        self.assertIsNone(s.memo)
+        self.assertEqual(2, CountingStringField.calls)
+
+
+class DumpCacheTests(unittest.TestCase):
+    def setUp(self):
+        CountingStringField.calls = 0
+        self.cache = DumpCache(version=lambda obj: obj.version)
+
+        class AuthorSerializer(Serializer):
+            class Meta:
+                dump_cache = self.cache
+
+            name = CountingStringField()
+            version = IntegerField()
+
+        self.author_serializer = AuthorSerializer
+
+    def test_reuses_data_across_calls(self):
+        author = Author("Marge")
+        first = self.author_serializer(object=author)
+        first.validate()
+        second = self.author_serializer(object=author)
+        second.validate()
+
+        self.assertEqual(1, CountingStringField.calls)
+        self.assertIs(first.data, second.data)
+
+    def test_version_change_invalidates(self):
+        author = Author("Marge")
+        self.author_serializer(object=author).validate()
+        author.name = "Marjorie"
+        author.version = 2
+        s = self.author_serializer(object=author)
+        s.validate()
+
+        self.assertEqual(2, CountingStringField.calls)
+        self.assertEqual({"name": "Marjorie", "version": 2}, s.data)
+
+    def test_entries_are_dropped_with_object(self):
+        author = Author("Marge")
+        self.author_serializer(object=author).validate()
+        self.assertEqual(1, len(self.cache))
+
+        del author
+        gc.collect()
+        self.assertEqual(0, len(self.cache))
+
+    def test_shared_between_serializers(self):
+        class SummarySerializer(Serializer):
+            class Meta:
+                dump_cache = self.cache
+
+            name = StringField()
+
+        author = Author("Marge")
+        self.author_serializer(object=author).validate()
+        s = SummarySerializer(object=author)
+        s.validate()
+        self.assertEqual({"name": "Marge"}, s.data)
+        s = self.author_serializer(object=author)
+        s.validate()
+        self.assertEqual({"name": "Marge", "version": 1}, s.data)
+        self.assertEqual(1, CountingStringField.calls)
+        self.assertEqual(2, len(self.cache))
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LoadCacheTests(unittest.TestCase):
+    def setUp(self):
+        CountingStringField.calls = 0
+        self.timer = FakeTimer()
+        self.cache = LoadCache(maxsize=2, ttl=60, timer=self.timer)
+
+        class FlagSerializer(Serializer):
+            class Meta:
+                load_cache = self.cache
+
+            name = StringField(required=True)
+            value = IntegerField()
+
+        self.flag_serializer = FlagSerializer
+
+    def load(self, data):
+        s = self.flag_serializer(data=data)
+        s.validate()
+        return s.object
+
+    def test_identical_payloads_hit(self):
+        first = self.load({"name": "beta", "value": 1})
+        second = self.load({"value": 1, "name": "beta"})
+
+        self.assertIs(first, second)
+        self.assertEqual({"hits": 1, "misses": 1, "evictions": 0, "expirations": 0, "size": 1}, self.cache.stats())
+
+    def test_keys_preserve_types(self):
+        key = LoadCache.key_for_data
+        self.assertEqual(key({"a": [1, {"b": None}], "c": 1.5}), key({"c": 1.5, "a": [1, {"b": None}]}))
+        distinct = [{1: "a"}, {"1": "a"}, {"a": (1,)}, {"a": [1]}, {"a": 1}, {"a": 1.0}, {"a": True}, {"a": "1"},
+                    {"a": None}, {"a": "None"}, {"a": b"x"}, {"a": u"x"}]
+        self.assertEqual(len(distinct), len(set(key(data) for data in distinct)))
+        self.assertIsNone(key({"a": object()}))
+        self.assertIsNone(key({"a": set()}))
+
+    def test_keys_include_options(self):
+        data = {"name": "a"}
+        plain = self.load(data)
+        s = self.flag_serializer(data=data, view=True)
+        s.validate()
+        self.assertIsInstance(s.object, DataView)
+        self.assertIsNot(plain, s.object)
+        self.assertIs(plain, self.load(data))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_lru_eviction(self):
+        a = self.load({"name": "a"})
+        self.load({"name": "b"})
+        self.assertIs(a, self.load({"name": "a"}))
+        self.load({"name": "c"})
+
+        self.assertEqual(1, self.cache.evictions)
+        self.assertIs(a, self.load({"name": "a"}))
+        self.assertEqual(2, self.cache.hits)
+
+    def test_ttl_expiry(self):
+        first = self.load({"name": "a"})
+        self.timer.now = 61
+        second = self.load({"name": "a"})
+
+        self.assertIsNot(first, second)
+        self.assertEqual(1, self.cache.expirations)
+
+    def test_invalid_payloads_are_not_cached(self):
+        for _ in range(2):
+            self.assertRaises(ValidationError, self.load, {"name": 1})
+        self.assertEqual(0, len(self.cache))
+
+    def test_copy(self):
+        self.cache.copy = True
+        first = self.load({"name": "a", "value": 2})
+        second = self.load({"name": "a", "value": 2})
+
+        self.assertIsNot(first, second)
+        self.assertEqual(first.value, second.value)
+
+    def test_load_bytes(self):
+        raw = b'{"name": "gamma", "value": 3}'
+        first = self.cache.load_bytes(self.flag_serializer, raw)
+        second = self.cache.load_bytes(self.flag_serializer, raw)
+
+        self.assertIs(first, second)
+        self.assertEqual("gamma", first.name)
+        self.assertEqual(1, self.cache.hits)
@@ -0,0 +1,66 @@
+from datetime import datetime
+import unittest
+
+from r2dto.columnar import load_columns
+from r2dto.fields import StringField, BooleanField, FloatField, IntegerField, DateTimeField
+from r2dto.validators import EnumValidator
+from r2dto import Serializer, ValidationError
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ReadingSerializer(Serializer):
+    sensor = StringField(required=True, allow_null=False, validators=[EnumValidator("a", "b")])
+    value = FloatField(name="val")
+    count = IntegerField()
+    ok = BooleanField()
+    taken = DateTimeField()
+
+
+RECORDS = [
+    {"sensor": "a", "val": 1.5, "count": 1, "ok": True, "taken": "2013-12-30 23:56:23.431090"},
+    {"sensor": "b", "val": None, "count": 2, "ok": False},
+    {"sensor": "a", "val": 2.5, "ok": True, "taken": None},
+]
+
+
+class LoadColumnsTests(unittest.TestCase):
+    def test_columns(self):
+        res = load_columns(ReadingSerializer, RECORDS, use_numpy=False)
+        self.assertEqual(3, len(res))
+        self.assertEqual(["a", "b", "a"], res.columns["sensor"])
+        self.assertEqual([1.5, None, 2.5], res.columns["value"])
+        self.assertEqual([1, 2, None], res.columns["count"])
+        self.assertEqual([datetime(2013, 12, 30, 23, 56, 23, 431090), None, None], res.columns["taken"])
+        self.assertEqual([False, False, False], res.null_masks["sensor"])
+        self.assertEqual([False, True, False], res.null_masks["value"])
+        self.assertEqual([False, False, True], res.null_masks["count"])
+        self.assertEqual([False, True, True], res.null_masks["taken"])
+
+    def test_errors(self):
+        records = [
+            {"sensor": "c", "count": 1},
+            {"val": 1.5, "count": "two"},
+            {"sensor": None, "taken": "yesterday"},
+            "not a record",
+        ]
+        self.assertRaises(ValidationError, load_columns, ReadingSerializer, records)
+        try:
+            load_columns(ReadingSerializer, records[:3])
+            self.fail("No Exception was thrown, records should have failed validation")
+        except ValidationError as ex:
+            self.assertEqual(5, len(ex.errors))
+            self.assertEqual(["[0]", "[1]", "[1]", "[2]", "[2]"], sorted(e.split(":")[0] for e in ex.errors))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_columns(self):
+        res = load_columns(ReadingSerializer, RECORDS)
+        self.assertEqual(numpy.float64, res.columns["value"].dtype)
+        self.assertEqual(numpy.int64, res.columns["count"].dtype)
+        self.assertEqual(numpy.bool_, res.columns["ok"].dtype)
+        self.assertEqual([1, 2, 0], list(res.columns["count"]))
+        self.assertTrue(numpy.isnan(res.columns["value"][1]))
+        self.assertEqual(["a", "b", "a"], res.columns["sensor"])
@@ -0,0 +1,143 @@
+import unittest
+
+from r2dto.fields import StringField, IntegerField, ObjectField, ListField, UnionField
+from r2dto.instrumentation import Instrumentation
+from r2dto.sampling import Sampler
+from r2dto import Serializer, ValidationError
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class InstrumentationTests(unittest.TestCase):
+    def setUp(self):
+        self.instrumentation = Instrumentation(timer=FakeTimer())
+
+        class ChildSerializer(Serializer):
+            value = IntegerField()
+
+        class ParentSerializer(Serializer):
+            class Meta:
+                instrumentation = self.instrumentation
+
+            name = StringField()
+            children = ListField(ObjectField(ChildSerializer))
+
+        self.child_serializer = ChildSerializer
+        self.parent_serializer = ParentSerializer
+
+    def test_counters(self):
+        s = self.parent_serializer(data={"name": "a", "children": [{"value": 1}, {"value": 2}]})
+        s.validate()
+        self.assertRaises(ValidationError, self.parent_serializer(data={"name": 1}).validate)
+        self.parent_serializer(object=s.object).validate()
+
+        counters = self.instrumentation.as_dict()
+        self.assertEqual(2, counters["load"]["ParentSerializer"]["calls"])
+        self.assertEqual(1, counters["load"]["ParentSerializer"]["errors"])
+        self.assertEqual(2, counters["field_load"]["ParentSerializer.name"]["calls"])
+        self.assertEqual(1, counters["field_load"]["ParentSerializer.name"]["errors"])
+        self.assertEqual(2, counters["load"]["ChildSerializer"]["calls"])
+        self.assertEqual(2, counters["field_load"]["ChildSerializer.value"]["calls"])
+        self.assertEqual(1, counters["dump"]["ParentSerializer"]["calls"])
+        self.assertEqual(2, counters["field_dump"]["ChildSerializer.value"]["calls"])
+        self.assertEqual(1.0, counters["field_load"]["ChildSerializer.value"]["max_seconds"])
+
+    def test_trusted_dumps(self):
+        s = self.parent_serializer(data={"name": "a", "children": [{"value": 1}, {"value": 2}]})
+        s.validate()
+        self.parent_serializer(object=s.object).validate()
+        checked = self.instrumentation.as_dict()["field_dump"]
+
+        self.instrumentation.reset()
+        self.parent_serializer(object=s.object, trusted=True).validate()
+        counters = self.instrumentation.as_dict()
+        self.assertEqual(1, counters["dump"]["ParentSerializer"]["calls"])
+        for path in ("ParentSerializer.name", "ParentSerializer.children", "ChildSerializer.value"):
+            self.assertEqual(checked[path]["calls"], counters["field_dump"][path]["calls"])
+
+        self.instrumentation.uninstrument(self.parent_serializer)
+        self.instrumentation.reset()
+        self.parent_serializer(object=s.object, trusted=True).validate()
+        self.assertEqual({}, self.instrumentation.as_dict())
+
+    def test_unchecked_loads(self):
+        class SampledSerializer(Serializer):
+            class Meta:
+                instrumentation = self.instrumentation
+                sampler = Sampler(every=2)
+
+            name = StringField()
+            child = ObjectField(self.child_serializer)
+
+        for i in range(4):
+            SampledSerializer(data={"name": "a", "child": {"value": i}}).validate()
+        # Only two of the records are validated, and the other two are loaded through the plan.
+        self.assertEqual(2, SampledSerializer.options.sampler.sampled)
+        counters = self.instrumentation.as_dict()
+        self.assertEqual(4, counters["load"]["SampledSerializer"]["calls"])
+        self.assertEqual(4, counters["field_load"]["SampledSerializer.name"]["calls"])
+        self.assertEqual(4, counters["field_load"]["SampledSerializer.child"]["calls"])
+        self.assertEqual(4, counters["field_load"]["ChildSerializer.value"]["calls"])
+
+    def test_hooks(self):
+        events = []
+        self.instrumentation.add_hook(lambda kind, path, elapsed, error: events.append((kind, path, error)))
+        self.parent_serializer(data={"name": "a"}).validate()
+        self.assertEqual([("field_load", "ParentSerializer.name", False), ("load", "ParentSerializer", False)],
+                         events)
+
+    def test_prometheus(self):
+        self.parent_serializer(data={"name": "a"}).validate()
+        text = self.instrumentation.to_prometheus()
+        self.assertIn("# TYPE r2dto_calls_total counter\n", text)
+        self.assertIn('r2dto_calls_total{kind="load",path="ParentSerializer"} 1\n', text)
+        self.assertIn('r2dto_errors_total{kind="field_load",path="ParentSerializer.name"} 0\n', text)
+
+    def test_uninstrument(self):
+        self.instrumentation.uninstrument(self.parent_serializer)
+        self.assertNotIn("data_to_object", self.parent_serializer.__dict__)
+        self.assertNotIn("base_clean", self.child_serializer.fields[0].__dict__)
+
+        self.parent_serializer(data={"name": "a", "children": [{"value": 1}]}).validate()
+        self.assertEqual({}, self.instrumentation.as_dict())
+
+    def test_plain_serializers_are_untouched(self):
+        class PlainSerializer(Serializer):
+            name = StringField()
+
+        self.assertNotIn("data_to_object", PlainSerializer.__dict__)
+        self.assertNotIn("base_clean", PlainSerializer.fields[0].__dict__)
+
+    def test_forward_references(self):
+        # A serializer of the same name in another module, which must not be picked before the name can be resolved.
+        other = type("ForwardTargetSerializer", (Serializer,), {
+            "__module__": "tests.other_instrumentation",
+            "count": IntegerField(),
+        })
+
+        class ForwardSerializer(Serializer):
+            class Meta:
+                instrumentation = self.instrumentation
+
+            target = ObjectField("ForwardTargetSerializer")
+            targets = ListField(UnionField({"target": "ForwardTargetSerializer"}))
+
+        target = type("ForwardTargetSerializer", (Serializer,), {"__module__": __name__, "value": IntegerField()})
+        self.assertNotIn("_instrumentation", target.__dict__)
+
+        s = ForwardSerializer(data={"target": {"value": 1}, "targets": []})
+        s.validate()
+        self.assertIs(target, ForwardSerializer.fields[0].serializer_class)
+        self.assertEqual(1, self.instrumentation.as_dict()["field_load"]["ForwardTargetSerializer.value"]["calls"])
+        self.assertNotIn("_instrumentation", other.__dict__)
+
+        ForwardSerializer.prepare()
+        self.assertEqual({"target": target}, ForwardSerializer.fields[1].allowed_types[0].serializers)
+        self.assertIs(self.instrumentation, target._instrumentation)
@@ -0,0 +1,69 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from r2dto.__main__ import main, import_serializer
+from tests.test_ndjson import RowSerializer
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "rows.ndjson")
+        with open(self.path, "w") as f:
+            for i in range(20):
+                f.write(json.dumps({"name": "row{}".format(i), "count": i if i != 5 else "five"}) + "\n")
+        self.stdout = io.StringIO()
+        self.stderr = io.StringIO()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def run_main(self, *args, **kwargs):
+        argv = ["validate", "--serializer", "tests.test_ndjson:RowSerializer"] + list(args)
+        return main(argv, stdin=kwargs.get("stdin"), stdout=self.stdout, stderr=self.stderr)
+
+    def report(self):
+        return dict(line.split(": ", 1) for line in self.stderr.getvalue().splitlines())
+
+    def test_validate_file(self):
+        for workers in ("1", "2"):
+            self.stdout = io.StringIO()
+            self.stderr = io.StringIO()
+            self.assertEqual(1, self.run_main("--workers", workers, self.path))
+            errors = [json.loads(line) for line in self.stdout.getvalue().splitlines()]
+            self.assertEqual([6], [error["line"] for error in errors])
+            self.assertEqual(self.path, errors[0]["input"])
+
+            report = self.report()
+            self.assertEqual("20", report["records"])
+            self.assertEqual("1", report["invalid"])
+            for key in ("elapsed", "records/sec", "p50 latency", "p99 latency"):
+                self.assertIn(key, report)
+
+    def test_validate_stdin(self):
+        stdin = io.StringIO(u'{"name": "a"}\n\n{"name": 1}\n[]\n{"name": "b"}\n')
+        self.assertEqual(1, self.run_main("-", stdin=stdin))
+        self.assertEqual([3, 4], [json.loads(line)["line"] for line in self.stdout.getvalue().splitlines()])
+        self.assertEqual("4", self.report()["records"])
+
+        stdin = io.StringIO(u'{"name": "a"}\n')
+        self.stdout = io.StringIO()
+        self.stderr = io.StringIO()
+        self.assertEqual(0, self.run_main(stdin=stdin))
+        self.assertEqual("", self.stdout.getvalue())
+
+    def test_fail_fast_and_errors_file(self):
+        errors_path = os.path.join(self.dir, "errors.ndjson")
+        stdin = io.StringIO(u'{"name": 1}\n{"name": 2}\n')
+        self.assertEqual(1, self.run_main("--fail-fast", "--errors", errors_path, "-", self.path, stdin=stdin))
+        with open(errors_path) as f:
+            self.assertEqual(1, len(f.readlines()))
+        self.assertEqual("1", self.report()["records"])
+
+    def test_import_serializer(self):
+        self.assertIs(RowSerializer, import_serializer("tests.test_ndjson:RowSerializer"))
+        self.assertRaises(ValueError, import_serializer, "tests.test_ndjson.RowSerializer")
@@ -0,0 +1,34 @@
+import unittest
+
+from benchmarks import memory
+
+
+class MemoryBudgetTests(unittest.TestCase):
+    def assert_within_budget(self, name):
+        if memory.tracemalloc is None:
+            self.skipTest("tracemalloc is not available")
+        if not memory.is_reference_version():
+            self.skipTest("the budgets were measured on CPython {}.{}".format(*memory.REFERENCE_VERSION))
+        result = memory.measure(name)
+        self.assertEqual([], memory.check(name, result))
+
+    def test_default_model(self):
+        self.assert_within_budget("default_model")
+
+    def test_list_field(self):
+        self.assert_within_budget("list_field")
+
+    def test_datetimes(self):
+        self.assert_within_budget("datetimes")
+
+    def test_nested(self):
+        self.assert_within_budget("nested")
+
+    def test_view(self):
+        self.assert_within_budget("view")
+
+    def test_check(self):
+        result = {"peak_bytes_per_record": 10 ** 6, "retained_bytes_per_record": 0}
+        failures = memory.check("nested", result)
+        self.assertEqual(1, len(failures))
+        self.assertTrue(failures[0].startswith("nested peak_bytes_per_record"))
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from r2dto.fields import StringField, IntegerField
+from r2dto.ndjson import LatencyHistogram, load_ndjson, split_ranges
+from r2dto import Serializer
+
+
+class RowSerializer(Serializer):
+    name = StringField(required=True)
+    count = IntegerField()
+
+
+class LoadNdjsonTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "rows.ndjson")
+        lines = []
+        for i in range(200):
+            if i % 50 == 7:
+                lines.append(json.dumps({"count": i}))
+            elif i == 100:
+                lines.append("{not json")
+            elif i == 150:
+                lines.append("")
+            else:
+                lines.append(json.dumps({"name": "row{}".format(i), "count": i}))
+        with open(self.path, "w") as f:
+            f.write("\n".join(lines))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_split_ranges(self):
+        size = os.path.getsize(self.path)
+        ranges = split_ranges(self.path, 7)
+        self.assertEqual(0, ranges[0][0])
+        self.assertEqual(size, ranges[-1][1])
+        with open(self.path, "rb") as f:
+            content = f.read()
+        for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(b"\n", content[end - 1:end])
+
+    def check_result(self, res):
+        self.assertEqual(199, res.count)
+        self.assertEqual([8, 58, 101, 108, 158], [line for line, _ in res.errors])
+        self.assertEqual(["Field name is missing."], res.errors[0][1])
+        self.assertTrue(res.errors[2][1][0].startswith("Invalid JSON"))
+        self.assertEqual(194, len(res.objects))
+        self.assertEqual("row199", res.objects[-1].name)
+        self.assertEqual([o.count for o in res.objects], sorted(o.count for o in res.objects))
+
+    def test_in_process(self):
+        self.check_result(load_ndjson(self.path, RowSerializer, chunks=5))
+
+    def test_workers(self):
+        self.check_result(load_ndjson(self.path, RowSerializer, workers=2, chunks=9))
+
+    def test_fail_fast_and_timings(self):
+        res = load_ndjson(self.path, RowSerializer, workers=2, collect=False, fail_fast=True, timings=True)
+        self.assertIsNone(res.objects)
+        self.assertEqual([8], [line for line, _ in res.errors])
+        self.assertEqual(res.count, res.timings.count)
+
+        # Only the ranges up to the one holding the first error are loaded.
+        res = load_ndjson(self.path, RowSerializer, workers=2, chunks=40, fail_fast=True)
+        self.assertEqual([8], [line for line, _ in res.errors])
+        self.assertTrue(res.count < 20, res.count)
+
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(0.0, histogram.percentile(50))
+        for ms in range(1, 51):
+            histogram.add(ms / 1000.0)
+        other = LatencyHistogram()
+        for ms in range(51, 101):
+            other.add(ms / 1000.0)
+        other.add(0)
+        other.add(10 ** 9)
+        histogram.merge(other)
+        self.assertEqual(102, histogram.count)
+        self.assertEqual(LatencyHistogram.BUCKETS, len(histogram.counts))
+        self.assertAlmostEqual(0.050, histogram.percentile(50), delta=0.050 * 0.05)
+        self.assertAlmostEqual(0.099, histogram.percentile(98), delta=0.099 * 0.05)
+        self.assertTrue(histogram.percentile(0) <= LatencyHistogram.MIN_SECONDS * 2)
+
+    def test_empty_file(self):
+        open(self.path, "w").close()
+        res = load_ndjson(self.path, RowSerializer, workers=2)
+        self.assertEqual(0, res.count)
+        self.assertEqual([], res.objects)
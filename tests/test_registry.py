@@ -0,0 +1,175 @@
+import sys
+import unittest
+
+from r2dto import Serializer, ValidationError
+from r2dto.fields import DictField, IntegerField, ListField, ObjectField, StringField, UnionField
+from r2dto.instrumentation import Instrumentation
+from r2dto.registry import get_serializer, registered_serializers, warm_up
+
+
+class Node(object):
+    pass
+
+
+class NodeSerializer(Serializer):
+    class Meta(object):
+        model = Node
+    name = StringField()
+    children = ListField(ObjectField("NodeSerializer"))
+
+
+class Employee(object):
+    pass
+
+
+class Team(object):
+    pass
+
+
+class EmployeeSerializer(Serializer):
+    class Meta(object):
+        model = Employee
+    name = StringField()
+    team = ObjectField("TeamSerializer")
+
+
+class TeamSerializer(Serializer):
+    class Meta(object):
+        model = Team
+    title = StringField()
+    lead = ObjectField(EmployeeSerializer)
+
+
+class TreeSerializer(Serializer):
+    name = StringField()
+    children = ListField(ObjectField("TreeSerializer"))
+    by_name = DictField(StringField(), ObjectField("TreeSerializer"))
+    variants = ListField(UnionField({"tree": "TreeSerializer"}))
+
+
+# A serializer of the same name in another module, which must not make the nested references above ambiguous.
+OtherTreeSerializer = type("TreeSerializer", (Serializer,), {
+    "__module__": "tests.other_trees",
+    "count": IntegerField(),
+})
+
+
+class RegistryTests(unittest.TestCase):
+    def test_get_serializer(self):
+        self.assertIs(NodeSerializer, get_serializer("NodeSerializer"))
+        self.assertIs(NodeSerializer, get_serializer("tests.test_registry.NodeSerializer"))
+        self.assertIs(NodeSerializer, get_serializer("NodeSerializer", "tests.test_registry"))
+        self.assertIn(NodeSerializer, registered_serializers())
+        self.assertRaises(LookupError, get_serializer, "NoSuchSerializer")
+
+    @unittest.skipIf(sys.version_info < (3, 3), "classes have no qualified names before python 3.3")
+    def test_ambiguous_name(self):
+        def define():
+            class DuplicateRegistrySerializer(Serializer):
+                pass
+            return DuplicateRegistrySerializer
+
+        first = define()
+        self.assertIs(first, get_serializer("DuplicateRegistrySerializer"))
+
+        class DuplicateRegistrySerializer(Serializer):
+            pass
+
+        self.assertRaises(LookupError, get_serializer, "DuplicateRegistrySerializer")
+        name = "tests.test_registry.RegistryTests.test_ambiguous_name.<locals>.define.<locals>."
+        self.assertIs(first, get_serializer(name + "DuplicateRegistrySerializer"))
+
+    def test_recursive(self):
+        children = [{"name": "a", "children": []}, {"name": "b", "children": [{"name": "c", "children": []}]}]
+        s = NodeSerializer(data={"name": "root", "children": children})
+        s.validate()
+        self.assertEqual(["a", "b"], [child.name for child in s.object.children])
+        self.assertEqual("c", s.object.children[1].children[0].name)
+
+        s = NodeSerializer(object=s.object)
+        s.validate()
+        self.assertEqual("c", s.data["children"][1]["children"][0]["name"])
+
+    def test_nested_fields_use_declaring_module(self):
+        self.assertRaises(LookupError, get_serializer, "TreeSerializer")
+        leaf = {"name": "leaf"}
+        s = TreeSerializer(data={"name": "root", "children": [leaf], "by_name": {"leaf": leaf},
+                                 "variants": [{"type": "tree", "name": "leaf"}]})
+        s.validate()
+        self.assertEqual("leaf", s.object.children[0].name)
+        self.assertEqual("leaf", s.object.by_name["leaf"].name)
+        self.assertEqual("leaf", s.object.variants[0].name)
+        self.assertIs(TreeSerializer, TreeSerializer.fields[1].allowed_types[0].serializer_class)
+        self.assertIs(TreeSerializer, TreeSerializer.fields[2].value_field.parent)
+
+    def test_recursive_compact(self):
+        self.assertEqual(["name", ["children", ["NodeSerializer"]]], NodeSerializer.compact_schema())
+        self.assertEqual(["name", ["team", ["title", ["lead", "EmployeeSerializer"]]]],
+                         EmployeeSerializer.compact_schema())
+
+        leaf = {"name": "b", "children": []}
+        s = NodeSerializer(data={"name": "root", "children": [{"name": "a", "children": [leaf]}]})
+        s.validate()
+        payload = NodeSerializer.dump_compact([s.object])
+        self.assertEqual([["root", [["a", [["b", []]]]]]], payload["records"])
+        objects = NodeSerializer.load_compact(payload)
+        self.assertEqual("b", objects[0].children[0].children[0].name)
+
+    def test_mutually_recursive(self):
+        lead = Employee()
+        lead.name = "Homer"
+        team = Team()
+        team.title = "Safety"
+        team.lead = lead
+        lead.team = None
+
+        s = TeamSerializer(object=team)
+        s.validate()
+        self.assertEqual({"title": "Safety", "lead": {"name": "Homer", "team": None}}, s.data)
+
+        s = EmployeeSerializer(data={"name": "Lenny", "team": {"title": "Safety", "lead": {"name": "Carl"}}})
+        s.validate()
+        self.assertEqual("Carl", s.object.team.lead.name)
+
+    def test_unresolved(self):
+        class DanglingSerializer(Serializer):
+            other = ObjectField("DanglingTargetSerializer")
+
+        s = DanglingSerializer(data={"other": {}})
+        self.assertRaises(LookupError, s.validate)
+        self.assertRaises(LookupError, DanglingSerializer.prepare)
+
+    def test_union_by_name(self):
+        class UnionByNameSerializer(Serializer):
+            node = UnionField({"node": "NodeSerializer", "team": "TeamSerializer"})
+
+        s = UnionByNameSerializer(data={"node": {"type": "team", "title": "Safety"}})
+        s.validate()
+        self.assertIsInstance(s.object.node, Team)
+        self.assertEqual({Node: "node", Team: "team"}, UnionByNameSerializer.fields[0].tags_by_model)
+        self.assertRaises(ValidationError, UnionByNameSerializer(data={"node": {"type": "x"}}).validate)
+
+    def test_warm_up(self):
+        class WarmChildSerializer(Serializer):
+            count = IntegerField()
+
+        class WarmSerializer(Serializer):
+            child = ObjectField("WarmChildSerializer")
+            items = ListField(ObjectField("WarmSerializer"))
+
+        self.assertNotIn("_trusted_plan", WarmSerializer.__dict__)
+        self.assertEqual([WarmSerializer], warm_up([WarmSerializer]))
+        self.assertIn("_trusted_plan", WarmSerializer.__dict__)
+        self.assertIn("_trusted_load_plan", WarmChildSerializer.__dict__)
+        self.assertIs(WarmChildSerializer, WarmSerializer.fields[0].serializer_class)
+
+    def test_instrument_forward_reference(self):
+        instrumentation = Instrumentation()
+
+        class InstrumentedForwardSerializer(Serializer):
+            class Meta(object):
+                pass
+            Meta.instrumentation = instrumentation
+            other = ObjectField("InstrumentedForwardTargetSerializer")
+
+        self.assertIs(instrumentation, InstrumentedForwardSerializer._instrumentation)
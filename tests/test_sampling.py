@@ -0,0 +1,154 @@
+import unittest
+import uuid
+
+from r2dto import Serializer, ValidationError
+from r2dto.cache import LoadCache
+from r2dto.fields import IntegerField, ListField, ObjectField, UuidField
+from r2dto.sampling import Sampler
+from r2dto.validators import RangeValidator
+
+
+class Model(object):
+    pass
+
+
+class SamplerTests(unittest.TestCase):
+    def test_arguments(self):
+        self.assertRaises(ValueError, Sampler)
+        self.assertRaises(ValueError, Sampler, rate=0.5, every=2)
+        self.assertRaises(ValueError, Sampler, every=0)
+
+    def test_every(self):
+        sampler = Sampler(every=3)
+        self.assertEqual([True, False, False, True, False, False, True], [sampler.sample() for _ in range(7)])
+        self.assertEqual({"seen": 7, "sampled": 3, "sampled_errors": 0, "detected_errors": 0, "error_rate": 0.0,
+                          "escalated": False}, sampler.stats())
+
+    def test_rate(self):
+        sampler = Sampler(rate=0.25, seed=1)
+        chosen = sum(sampler.sample() for _ in range(1000))
+        self.assertTrue(150 < chosen < 350, chosen)
+        self.assertEqual(chosen, sampler.sampled)
+
+    def test_escalation(self):
+        sampler = Sampler(every=10, threshold=0.5, min_samples=2)
+        sampler.sample()
+        sampler.record(sampled_errors=1)
+        self.assertFalse(sampler.escalated)
+        for _ in range(10):
+            sampler.sample()
+        sampler.record(sampled_errors=0)
+        self.assertTrue(sampler.escalated)
+        self.assertTrue(all(sampler.sample() for _ in range(5)))
+
+        sampler.reset()
+        self.assertFalse(sampler.escalated)
+        self.assertEqual(0, sampler.seen)
+
+    def test_list_field(self):
+        sampler = Sampler(every=2)
+
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            values = ListField(IntegerField(validators=[RangeValidator(0, 9)]), sampler=sampler)
+            ids = ListField(UuidField(), sampler=sampler)
+
+        s = AS(data={"values": [1, 20, 3, 40], "ids": []})
+        s.validate()
+        # Only the sampled items, 1 and 3, are validated.
+        self.assertEqual([1, 20, 3, 40], s.object.values)
+
+        sampler.reset()
+        s = AS(data={"values": [10, 2], "ids": []})
+        with self.assertRaises(ValidationError) as ctx:
+            s.validate()
+        self.assertEqual(["values[0]: ['values must be between 0 and 9.  Got 10.']"], ctx.exception.errors)
+        self.assertEqual(1, sampler.sampled_errors)
+
+        # Items that are not sampled are still converted, and validated if they cannot be.
+        sampler.reset()
+        s = AS(data={"values": [], "ids": ["46b4e146-21a7-435e-a0d3-f7d6ce773085"] * 2})
+        s.validate()
+        self.assertEqual([uuid.UUID("46b4e146-21a7-435e-a0d3-f7d6ce773085")] * 2, s.object.ids)
+
+        sampler.reset()
+        s = AS(data={"values": [], "ids": ["46b4e146-21a7-435e-a0d3-f7d6ce773085", "bad"]})
+        self.assertRaises(ValidationError, s.validate)
+        self.assertEqual(0, sampler.sampled_errors)
+        self.assertEqual(1, sampler.detected_errors)
+
+    def test_records(self):
+        class ChildSerializer(Serializer):
+            class Meta(object):
+                model = Model
+            count = IntegerField(validators=[RangeValidator(0, 9)])
+
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+                sampler = Sampler(every=2, threshold=0.5, min_samples=3)
+            id = UuidField()
+            child = ObjectField(ChildSerializer)
+
+        sampler = AS.options.sampler
+        good = {"id": "46b4e146-21a7-435e-a0d3-f7d6ce773085", "child": {"count": 1}}
+        bad = {"child": {"count": 10}}
+        with self.assertRaises(ValidationError):
+            AS(data=bad).validate()
+        self.assertEqual(1, sampler.sampled_errors)
+
+        # The second record is not sampled, so neither it nor its child is validated.
+        s = AS(data=bad)
+        s.validate()
+        self.assertEqual(10, s.object.child.count)
+        self.assertTrue(s.unchecked)
+
+        s = AS(data=good)
+        s.validate()
+        self.assertEqual(uuid.UUID("46b4e146-21a7-435e-a0d3-f7d6ce773085"), s.object.id)
+
+        # Records that fail to convert are validated in full.
+        with self.assertRaises(ValidationError):
+            AS(data={"id": "bad", "child": {"count": 1}}).validate()
+        self.assertEqual(1, sampler.sampled_errors)
+        self.assertEqual(1, sampler.detected_errors)
+
+        with self.assertRaises(ValidationError):
+            AS(data=bad).validate()
+        self.assertTrue(sampler.escalated)
+        self.assertRaises(ValidationError, AS(data=bad).validate)
+
+    def test_unchecked_records_bypass_load_cache(self):
+        class ChildSerializer(Serializer):
+            class Meta(object):
+                model = Model
+                load_cache = LoadCache()
+            n = IntegerField()
+
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+                sampler = Sampler(every=1000)
+            child = ObjectField(ChildSerializer)
+
+        AS(data={"child": {"n": 1}}).validate()
+        s = AS(data={"child": {"n": "bad"}})
+        s.validate()
+        self.assertTrue(s.unchecked)
+        self.assertEqual(1, ChildSerializer.options.load_cache.stats()["size"])
+        self.assertRaises(ValidationError, ChildSerializer(data={"n": "bad"}).validate)
+
+    def test_unchecked_lists_must_be_lists(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+                sampler = Sampler(every=1000)
+            counts = ListField(IntegerField())
+            ids = ListField(UuidField())
+
+        sampler = AS.options.sampler
+        AS(data={"counts": [], "ids": []}).validate()
+        for data in ({"counts": "abc", "ids": []}, {"counts": [], "ids": {"a": 1}}):
+            self.assertRaises(ValidationError, AS(data=data).validate)
+        self.assertEqual(2, sampler.detected_errors)
@@ -0,0 +1,187 @@
+import re
+import unittest
+
+from r2dto import Serializer, ValidationError
+from r2dto.fields import IntegerField, ListField, StringField
+from r2dto.validators import EnumValidator, LengthValidator, PredicateValidator, RangeValidator, RegexValidator
+
+
+class Model(object):
+    pass
+
+
+class ValidatorTests(unittest.TestCase):
+    def assert_errors(self, serializer_class, data, errors):
+        s = serializer_class(data=data)
+        with self.assertRaises(ValidationError) as ctx:
+            s.validate()
+        self.assertEqual(ctx.exception.errors, errors)
+
+    def test_enum(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            grade = StringField(validators=[EnumValidator("A", "B")])
+
+        s = AS(data={"grade": "B"})
+        s.validate()
+        self.assertEqual(s.object.grade, "B")
+        self.assert_errors(AS, {"grade": "C"}, ["grade must be one of ('A', 'B').  Got C."])
+
+    def test_enum_unhashable(self):
+        v = EnumValidator([1], 2)
+        self.assertIsNone(v.choice_set)
+        self.assertTrue(v.is_valid([1]))
+        self.assertFalse(v.is_valid(3))
+
+        v = EnumValidator(1, 2)
+        self.assertFalse(v.is_valid([1]))
+
+    def test_range(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            both = IntegerField(validators=[RangeValidator(1, 10)])
+            low = IntegerField(validators=[RangeValidator(min_value=0)])
+            high = IntegerField(validators=[RangeValidator(max_value=5)])
+
+        AS(data={"both": 10, "low": 0, "high": 5}).validate()
+        self.assert_errors(AS, {"both": 11, "low": -1, "high": 6}, [
+            "both must be between 1 and 10.  Got 11.",
+            "low must be at least 0.  Got -1.",
+            "high must be at most 5.  Got 6.",
+        ])
+
+    def test_length(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            code = StringField(validators=[LengthValidator(2, 3)])
+            tags = ListField([StringField()], validators=[LengthValidator(max_length=1)])
+
+        AS(data={"code": "ab", "tags": ["x"]}).validate()
+        self.assert_errors(AS, {"code": "abcd", "tags": ["x", "y"]}, [
+            "code must have a length between 2 and 3.  Got 4.",
+            "tags must have a length of at most 1.  Got 2.",
+        ])
+        self.assertFalse(LengthValidator(1).is_valid(1))
+
+    def test_regex(self):
+        v = RegexValidator(r"^[a-z]+$", re.IGNORECASE)
+        self.assertTrue(v.is_valid("Abc"))
+        self.assertFalse(v.is_valid("ab1"))
+        self.assertFalse(v.is_valid(1))
+
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            slug = StringField(validators=[v])
+
+        self.assert_errors(AS, {"slug": "a b"}, ["slug must match ^[a-z]+$.  Got a b."])
+
+    def test_predicate(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            even = IntegerField(validators=[PredicateValidator(lambda n: n % 2 == 0)])
+            odd = IntegerField(validators=[PredicateValidator(lambda n: n % 2, "{} must be odd.  Got {}.")])
+
+        AS(data={"even": 2, "odd": 3}).validate()
+        self.assert_errors(AS, {"even": 3, "odd": 2}, ["even is invalid.  Got 3.", "odd must be odd.  Got 2."])
+
+    def test_validate_many(self):
+        field = IntegerField(name="n")
+        self.assertEqual(RangeValidator(0, 5).validate_many(field, [1, 6, 3, -1]), [
+            (1, "n must be between 0 and 5.  Got 6."),
+            (3, "n must be between 0 and 5.  Got -1."),
+        ])
+        self.assertEqual(RangeValidator(0, 5).validate_many(field, []), [])
+
+    def test_list_item_validators(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            grades = ListField([StringField(validators=[EnumValidator("A", "B")])])
+
+        s = AS(data={"grades": ["A", "B", "A"]})
+        s.validate()
+        self.assertEqual(s.object.grades, ["A", "B", "A"])
+        self.assert_errors(AS, {"grades": ["A", "C", "B", "D"]}, [
+            "grades[1]: [\"grades must be one of ('A', 'B').  Got C.\"]",
+            "grades[3]: [\"grades must be one of ('A', 'B').  Got D.\"]",
+        ])
+
+    def test_list_item_validators_batched(self):
+        calls = []
+
+        class CountingValidator(RangeValidator):
+            def validate_many(self, field, values):
+                calls.append(list(values))
+                return super(CountingValidator, self).validate_many(field, values)
+
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            scores = ListField([IntegerField(validators=[CountingValidator(0, 100)])])
+
+        self.assert_errors(AS, {"scores": [1, 200, 3]}, ["scores[1]: ['scores must be between 0 and 100.  Got 200.']"])
+        self.assertEqual(calls, [[1, 200, 3]])
+
+    def test_list_item_validators_keep_positions(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            values = ListField([IntegerField(validators=[RangeValidator(0, 9)]),
+                                StringField(validators=[LengthValidator(max_length=1)])])
+
+        def type_error(i, field_class, got):
+            return "values[{}]: {}".format(i, ["values must be a {}.  Got {}.".format(field_class.basetypes, got)])
+
+        AS(data={"values": [1, "a", 2]}).validate()
+        self.assert_errors(AS, {"values": [1, 1.5, "ab", 10]}, [
+            type_error(1, IntegerField, float),
+            type_error(1, StringField, float),
+            type_error(2, IntegerField, str),
+            "values[2]: ['values must have a length of at most 1.  Got 2.']",
+            "values[3]: ['values must be between 0 and 9.  Got 10.']",
+            type_error(3, StringField, int),
+        ])
+
+    def test_list_item_first_valid_type(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            values = ListField([IntegerField(validators=[RangeValidator(0, 9)]),
+                                IntegerField(validators=[RangeValidator(100, 199)])])
+
+        s = AS(data={"values": [1, 150]})
+        s.validate()
+        self.assertEqual(s.object.values, [1, 150])
+        self.assert_errors(AS, {"values": [50]}, [
+            "values[0]: ['values must be between 0 and 9.  Got 50.']",
+            "values[0]: ['values must be between 100 and 199.  Got 50.']",
+        ])
+
+    def test_list_item_first_failed_validator(self):
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            values = ListField(IntegerField(validators=[RangeValidator(0, 9), EnumValidator(1, 2, 30)]))
+
+        self.assert_errors(AS, {"values": [30, 1, 3]}, [
+            "values[0]: ['values must be between 0 and 9.  Got 30.']",
+            "values[2]: ['values must be one of (1, 2, 30).  Got 3.']",
+        ])
+
+    def test_list_item_plain_validator(self):
+        class PlainValidator(object):
+            def validate(self, field, data):
+                if data < 0:
+                    raise ValidationError("negative")
+
+        class AS(Serializer):
+            class Meta(object):
+                model = Model
+            values = ListField([IntegerField(validators=[PlainValidator()])])
+
+        self.assert_errors(AS, {"values": [1, -1]}, ["values[1]: ['negative']"])